@@ -33,6 +33,9 @@ class ChiXApp:
             "active_editor": None,
             "editors": {},
             "mode": "compiler",
+            "precompiled_headers": False,
+            "live_diagnostics": True,
+            "optimized_build": False,
             "theme_mode": "dark",
             "show_minimap": True,
             "tab_size": 4,
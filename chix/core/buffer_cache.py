@@ -0,0 +1,29 @@
+"""
+Editor text cache for ChiX Editor
+Shares one copy of an editor's text between the features that read it
+"""
+
+def get_code(editor):
+    """
+    Get the full text of an editor, fetching it from Tk only after an edit
+
+    Every insert or delete sets the text widget's modified flag. The flag is
+    cleared whenever the text is fetched, so while it stays clear the last
+    copy is still current. Must be called from the Tk thread.
+
+    Args:
+        editor: The EnhancedTextEditor widget
+
+    Returns:
+        str: Editor text, without Tk's trailing newline
+    """
+    text_widget = editor._textbox
+
+    cached = getattr(editor, "_code_cache", None)
+    if cached is not None and not text_widget.edit_modified():
+        return cached
+
+    code = editor.get("1.0", "end-1c")
+    text_widget.edit_modified(False)
+    editor._code_cache = code
+    return code
@@ -3,13 +3,157 @@ C compiler interface for ChiX Editor
 Handles compilation of C code using external compilers
 """
 
+import asyncio
 import subprocess
 import os
+import hashlib
 import platform
 import re
+import shutil
 import tempfile
 import threading
-import time
+
+# Diagnostic lines in file:line:col: kind: message format
+_DIAGNOSTIC_RE = re.compile(r'(.*?):(\d+):(\d+):\s*(warning|(?:fatal )?error|note):\s*(.*)')
+
+# Toolchain probes shared by every Compiler instance; a new Compiler is made
+# for each run, so these are kept until invalidate_compiler_cache() is called
+_compiler_cache = {}
+
+# Code generation flags for quick edit-and-run builds: no optimization,
+# unwind tables, stack canaries, PLT stubs or compiler ident string
+_FAST_CODEGEN_FLAGS = ['-O0', '-fno-asynchronous-unwind-tables', '-fno-stack-protector', '-fno-plt', '-fno-ident']
+
+# Seconds a compilation may take before it is stopped
+_COMPILE_TIMEOUT = 10
+
+# Last successful build per output path: (source and command digest,
+# executable mtime, warnings, (path, mtime) of each header it included)
+_last_builds = {}
+
+def invalidate_compiler_cache():
+    """Forget the detected compiler so the next Compiler looks on PATH again"""
+    _compiler_cache.clear()
+
+def _read_dependencies(depfile_path):
+    """
+    Read the files a build depended on from its make-style dependency file
+    
+    Args:
+        depfile_path (str): Dependency file written by -MMD
+    
+    Returns:
+        tuple: (path, mtime_ns) pairs, or None if the file or one of the
+            dependencies could not be read
+    """
+    try:
+        with open(depfile_path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return None
+    
+    # Join continuation lines, keep escaped spaces inside names and drop
+    # the target before the first ': '
+    names = text.replace("\\\n", " ").partition(": ")[2]
+    dependencies = []
+    for name in names.replace("\\ ", "\0").split():
+        path = os.path.abspath(name.replace("\0", " "))
+        try:
+            dependencies.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            return None
+    
+    return tuple(dependencies)
+
+def _dependencies_unchanged(dependencies):
+    """Check that no dependency of a build was modified since it was built"""
+    for path, mtime_ns in dependencies:
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+def _find_ccache():
+    """
+    Find ccache on PATH, once per session
+    
+    Returns:
+        str: Path to ccache or None if not installed
+    """
+    if "ccache" not in _compiler_cache:
+        _compiler_cache["ccache"] = shutil.which("ccache")
+    return _compiler_cache["ccache"]
+
+# Standard headers built into the shared precompiled header
+_PCH_HEADERS = ("stdio.h", "stdlib.h", "string.h", "math.h")
+
+def _precompiled_header(compiler_path, temp_dir):
+    """
+    Build the shared GCC precompiled header if it is missing or stale
+    
+    Args:
+        compiler_path (str): Path to the compiler
+        temp_dir (str): Directory the header is kept in
+    
+    Returns:
+        str: Header to pass to -include, or None if it could not be built
+    """
+    cached = _compiler_cache.get("pch")
+    if cached and cached[0] == compiler_path:
+        return cached[1]
+    
+    header_path = os.path.join(temp_dir, "pch", "common.h")
+    gch_path = header_path + ".gch"
+    try:
+        # Rebuild when the compiler was updated after the header was made
+        if not os.path.exists(gch_path) or os.stat(gch_path).st_mtime < os.stat(compiler_path).st_mtime:
+            os.makedirs(os.path.dirname(header_path), exist_ok=True)
+            with open(header_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"#include <{header}>\n" for header in _PCH_HEADERS))
+            
+            result = subprocess.run(
+                [compiler_path, "-x", "c-header", header_path, "-o", gch_path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=30
+            )
+            if result.returncode != 0:
+                header_path = None
+    except (OSError, subprocess.SubprocessError):
+        header_path = None
+    
+    _compiler_cache["pch"] = (compiler_path, header_path)
+    return header_path
+
+# Terminal emulators tried, in order, to run programs in their own window
+_TERMINAL_COMMANDS = (
+    ("x-terminal-emulator", "-e"),
+    ("gnome-terminal", "--"),
+    ("konsole", "-e"),
+    ("xterm", "-e"),
+)
+
+def find_terminal():
+    """
+    Find a terminal emulator on PATH, once per session
+    
+    Returns:
+        list: Command prefix that runs a program in a new terminal window,
+            or None if none is installed
+    """
+    if "terminal" not in _compiler_cache:
+        terminal = None
+        for name, flag in _TERMINAL_COMMANDS:
+            path = shutil.which(name)
+            if path:
+                terminal = [path, flag]
+                break
+        _compiler_cache["terminal"] = terminal
+    
+    terminal = _compiler_cache["terminal"]
+    return list(terminal) if terminal else None
 
 class CompilationResult:
     """Stores the result of a compilation operation"""
@@ -34,8 +178,17 @@ class CompilationResult:
 class Compiler:
     """Handles compilation of C code"""
     
-    def __init__(self):
-        """Initialize the compiler"""
+    def __init__(self, use_precompiled_headers=False):
+        """
+        Initialize the compiler
+        
+        Args:
+            use_precompiled_headers (bool, optional): Force-include a GCC
+                precompiled header of common standard headers in each build.
+                Off by default, since those headers then declare their names
+                in every program; never used in builds with an -O option
+        """
+        self.use_precompiled_headers = use_precompiled_headers
         self.compiler_path = self._detect_compiler()
         self.temp_dir = os.path.join(tempfile.gettempdir(), "chix_compiler")
         
@@ -50,26 +203,24 @@ class Compiler:
         Returns:
             str: Path to compiler or None if not found
         """
+        if "path" in _compiler_cache:
+            return _compiler_cache["path"]
+        
         compiler_commands = ["gcc", "clang", "tcc"]
         
         # On Windows, also check for MinGW
         if platform.system() == "Windows":
             compiler_commands.extend(["mingw32-gcc", "x86_64-w64-mingw32-gcc"])
         
+        # Look the commands up on PATH instead of starting each one
+        compiler_path = None
         for compiler in compiler_commands:
-            try:
-                result = subprocess.run(
-                    [compiler, "--version"], 
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE,
-                    timeout=1
-                )
-                if result.returncode == 0:
-                    return compiler
-            except (subprocess.SubprocessError, FileNotFoundError):
-                continue
+            compiler_path = shutil.which(compiler)
+            if compiler_path:
+                break
         
-        return None
+        _compiler_cache["path"] = compiler_path
+        return compiler_path
     
     def is_available(self):
         """
@@ -78,6 +229,12 @@ class Compiler:
         Returns:
             bool: True if a compiler is available, False otherwise
         """
+        # A compiler may have been installed since the last lookup, so look
+        # again before reporting that there is none
+        if self.compiler_path is None:
+            invalidate_compiler_cache()
+            self.compiler_path = self._detect_compiler()
+        
         return self.compiler_path is not None
     
     def get_compiler_info(self):
@@ -90,6 +247,11 @@ class Compiler:
         if not self.compiler_path:
             return "No C compiler detected. Please install GCC, Clang, or TCC."
         
+        # The version line only changes with the toolchain
+        cached = _compiler_cache.get("info")
+        if cached and cached[0] == self.compiler_path:
+            return cached[1]
+        
         try:
             result = subprocess.run(
                 [self.compiler_path, "--version"],
@@ -102,13 +264,15 @@ class Compiler:
             if result.returncode == 0:
                 # Extract first line of version info
                 version_info = result.stdout.strip().split('\n')[0]
-                return f"Using {version_info}"
+                info = f"Using {version_info}"
+                _compiler_cache["info"] = (self.compiler_path, info)
+                return info
             else:
                 return f"Compiler error: {result.stderr.strip()}"
         except Exception as e:
             return f"Error getting compiler info: {str(e)}"
     
-    def compile(self, source_path, output_path=None, options=None):
+    def compile(self, source_path, output_path=None, options=None, on_output=None):
         """
         Compile a C source file
         
@@ -116,6 +280,8 @@ class Compiler:
             source_path (str): Path to the C source file
             output_path (str, optional): Path for the output executable
             options (list, optional): Additional compiler options
+            on_output (callable, optional): Called with each line of compiler
+                output as it is written
         
         Returns:
             CompilationResult: Result of the compilation
@@ -138,9 +304,71 @@ class Compiler:
                 ["Source file not found"]
             )
         
+        # Read the source for the unchanged-build check
+        try:
+            with open(source_path, "rb") as f:
+                source = f.read()
+        except OSError:
+            source = None
+        
+        base_name = os.path.splitext(os.path.basename(source_path))[0]
+        return self._compile_source(source, [source_path], base_name, output_path, options, on_output, stdin_data=None)
+    
+    def compile_code(self, code, output_path=None, options=None, on_output=None):
+        """
+        Compile C code held in memory
+        
+        GCC and Clang read the code from stdin, so nothing is written to
+        disk first; other compilers get it through a file in the temp dir.
+        
+        Args:
+            code (str): C source code
+            output_path (str, optional): Path for the output executable
+            options (list, optional): Additional compiler options
+            on_output (callable, optional): Called with each line of compiler
+                output as it is written
+        
+        Returns:
+            CompilationResult: Result of the compilation
+        """
+        if not self.is_available():
+            return CompilationResult(
+                False, 
+                "No C compiler detected. Please install GCC, Clang, or TCC.",
+                None,
+                [],
+                ["Compiler not found"]
+            )
+        
+        compiler_name = os.path.basename(self.compiler_path)
+        if "gcc" not in compiler_name and "clang" not in compiler_name:
+            source_path = os.path.join(self.temp_dir, "program.c")
+            with open(source_path, "w", encoding="utf-8") as f:
+                f.write(code)
+            return self.compile(source_path, output_path, options, on_output)
+        
+        source = code.encode("utf-8")
+        return self._compile_source(source, ['-x', 'c', '-'], "program", output_path, options, on_output, stdin_data=source)
+    
+    def _compile_source(self, source, source_args, base_name, output_path, options, on_output, stdin_data):
+        """
+        Build an executable from a source file or from stdin
+        
+        Args:
+            source (bytes): Source code, used to detect unchanged builds;
+                None to always build
+            source_args (list): Compiler arguments naming the input
+            base_name (str): Executable name used when output_path is None
+            output_path (str): Path for the output executable, or None
+            options (list): Additional compiler options, or None
+            on_output (callable): Called with each line of output, or None
+            stdin_data (bytes): Data written to the compiler's stdin, or None
+        
+        Returns:
+            CompilationResult: Result of the compilation
+        """
         # Create output path if not specified
         if not output_path:
-            base_name = os.path.splitext(os.path.basename(source_path))[0]
             if platform.system() == "Windows":
                 output_path = os.path.join(self.temp_dir, f"{base_name}.exe")
             else:
@@ -149,80 +377,117 @@ class Compiler:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Remove previous executable if exists
-        if os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-            except Exception as e:
-                return CompilationResult(
-                    False,
-                    f"Could not remove previous executable: {str(e)}",
-                    None,
-                    [],
-                    [f"Failed to remove old executable: {str(e)}"]
-                )
-        
-        # Build compiler command
+        # Build compiler command; GCC and Clang runs go through ccache when it
+        # is installed, so rebuilding unchanged code is served from its cache
         compiler_cmd = [self.compiler_path]
+        env = None
+        ccache_path = _find_ccache()
+        compiler_name = os.path.basename(self.compiler_path)
+        if ccache_path and ("gcc" in compiler_name or "clang" in compiler_name):
+            compiler_cmd.insert(0, ccache_path)
+            env = dict(os.environ)
+            env.setdefault("CCACHE_DIR", os.path.join(self.temp_dir, "ccache"))
+        
+        # Pass intermediate output between compiler stages through pipes
+        # instead of temporary files
+        if "gcc" in compiler_name or "clang" in compiler_name:
+            compiler_cmd.append('-pipe')
         
         # Add warning flags
         compiler_cmd.extend(['-Wall', '-Wextra', '-fdiagnostics-color=never'])
         
+        # Skip back-end work the user never sees, unless the options ask for
+        # an optimization level of their own
+        optimized = any(option.startswith('-O') for option in options or ())
+        if ("gcc" in compiler_name or "clang" in compiler_name) and not optimized:
+            compiler_cmd.extend(_FAST_CODEGEN_FLAGS)
+        
+        # Parse the common standard headers once instead of in every build;
+        # Clang uses a different precompiled header format, and GCC ignores
+        # the header in optimized builds, since it was made without -O
+        if self.use_precompiled_headers and "gcc" in compiler_name and not optimized:
+            header_path = _precompiled_header(self.compiler_path, self.temp_dir)
+            if header_path:
+                compiler_cmd.extend(['-include', header_path])
+        
         # Add user options
         if options:
             compiler_cmd.extend(options)
         
+        # Have GCC and Clang list the local headers the build reads, so an
+        # edited header is not mistaken for an unchanged build
+        depfile_path = None
+        if "gcc" in compiler_name or "clang" in compiler_name:
+            depfile_path = output_path + ".d"
+            compiler_cmd.extend(['-MMD', '-MF', depfile_path])
+        
         # Add source and output paths
-        compiler_cmd.extend([source_path, '-o', output_path])
+        compiler_cmd.extend(source_args)
+        compiler_cmd.extend(['-o', output_path])
+        
+        # Reuse the previous executable if neither the source, the command
+        # nor any header it includes changed since it was built
+        digest = None
+        if source is not None and depfile_path:
+            hasher = hashlib.blake2b(source, digest_size=16)
+            hasher.update("\0".join(compiler_cmd).encode())
+            digest = hasher.digest()
+        
+        previous = _last_builds.get(output_path)
+        if digest is not None and previous and previous[0] == digest:
+            try:
+                reusable = os.stat(output_path).st_mtime_ns == previous[1]
+            except OSError:
+                reusable = False
+            reusable = reusable and _dependencies_unchanged(previous[3])
+            
+            if reusable:
+                return CompilationResult(
+                    True,
+                    "Source unchanged, reusing previous build",
+                    output_path,
+                    list(previous[2]),
+                    []
+                )
         
+        # Remove previous executable if exists, without a separate existence check
         try:
-            # Run compiler
-            process = subprocess.Popen(
-                compiler_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            os.unlink(output_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            return CompilationResult(
+                False,
+                f"Could not remove previous executable: {str(e)}",
+                None,
+                [],
+                [f"Failed to remove old executable: {str(e)}"]
             )
-            
-            # Set timeout for compilation (10 seconds)
-            start_time = time.time()
-            stdout, stderr = '', ''
-            
-            # Process output
-            while process.poll() is None:
-                # Check for timeout
-                if time.time() - start_time > 10:
-                    process.terminate()
-                    return CompilationResult(
-                        False,
-                        "Compilation timed out after 10 seconds",
-                        None,
-                        [],
-                        ["Compilation process timed out"]
-                    )
-                
-                # Read output
-                stdout_data = process.stdout.readline()
-                stderr_data = process.stderr.readline()
-                
-                if stdout_data:
-                    stdout += stdout_data
-                if stderr_data:
-                    stderr += stderr_data
-                
-                # Sleep briefly to avoid high CPU usage
-                time.sleep(0.1)
-            
-            # Get remaining output
-            stdout_remaining, stderr_remaining = process.communicate()
-            stdout += stdout_remaining
-            stderr += stderr_remaining
+        
+        try:
+            # Run compiler, streaming its diagnostics as they are written
+            try:
+                returncode, stderr = asyncio.run(self._run_compiler_process(compiler_cmd, env, on_output, stdin_data))
+            except asyncio.TimeoutError:
+                return CompilationResult(
+                    False,
+                    f"Compilation timed out after {_COMPILE_TIMEOUT} seconds",
+                    None,
+                    [],
+                    ["Compilation process timed out"]
+                )
             
             # Parse warnings and errors
             warnings, errors = self._parse_compiler_output(stderr)
             
-            if process.returncode == 0:
+            if returncode == 0:
                 # Compilation succeeded
+                dependencies = _read_dependencies(depfile_path) if digest is not None else None
+                if dependencies is not None:
+                    try:
+                        _last_builds[output_path] = (digest, os.stat(output_path).st_mtime_ns, warnings, dependencies)
+                    except OSError:
+                        pass
                 return CompilationResult(
                     True,
                     "Compilation successful",
@@ -249,6 +514,67 @@ class Compiler:
                 [f"Process error: {str(e)}"]
             )
     
+    async def _run_compiler_process(self, compiler_cmd, env, on_output, stdin_data=None):
+        """
+        Run the compiler and collect its diagnostics
+        
+        Args:
+            compiler_cmd (list): Compiler command line
+            env (dict): Environment for the compiler, or None to inherit
+            on_output (callable): Called with each line of output, or None
+            stdin_data (bytes, optional): Source fed to the compiler's stdin
+        
+        Returns:
+            tuple: (return code, diagnostics text)
+        
+        Raises:
+            asyncio.TimeoutError: If the compiler runs past the timeout; it
+                is killed first
+        """
+        process = await asyncio.create_subprocess_exec(
+            *compiler_cmd,
+            stdin=asyncio.subprocess.DEVNULL if stdin_data is None else asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        
+        lines = []
+        
+        async def write_source():
+            try:
+                process.stdin.write(stdin_data)
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # The compiler stopped reading; its diagnostics say why
+                pass
+            finally:
+                process.stdin.close()
+        
+        async def read_diagnostics():
+            # Lines are kept as bytes and only decoded one by one when they
+            # are streamed to a listener
+            async for line in process.stderr:
+                lines.append(line)
+                if on_output:
+                    on_output(line.decode("utf-8", "replace"))
+            await process.wait()
+        
+        async def run():
+            if stdin_data is None:
+                await read_diagnostics()
+            else:
+                await asyncio.gather(write_source(), read_diagnostics())
+        
+        try:
+            await asyncio.wait_for(run(), _COMPILE_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        
+        return process.returncode, b"".join(lines).decode("utf-8", "replace")
+    
     def _parse_compiler_output(self, output):
         """
         Parse compiler output to extract warnings and errors
@@ -283,19 +609,26 @@ class Compiler:
         
         return warnings, errors
     
-    def compile_and_run(self, source_path, options=None):
+    def compile_and_run(self, source_path, options=None, on_output=None, code=None):
         """
         Compile and run a C source file
         
         Args:
             source_path (str): Path to the C source file
             options (list, optional): Additional compiler options
+            on_output (callable, optional): Called with each line of compiler
+                output as it is written
+            code (str, optional): Source code to compile instead of reading
+                source_path
         
         Returns:
             tuple: (CompilationResult, process) where process is the running process or None
         """
         # Compile the file
-        result = self.compile(source_path, options=options)
+        if code is not None:
+            result = self.compile_code(code, options=options, on_output=on_output)
+        else:
+            result = self.compile(source_path, options=options, on_output=on_output)
         
         if result.success and result.executable_path:
             try:
@@ -307,32 +640,14 @@ class Compiler:
                         creationflags=subprocess.CREATE_NEW_CONSOLE
                     )
                 else:
-                    # On Unix, try to open in a terminal
-                    terminal_commands = [
-                        ['x-terminal-emulator', '-e'],
-                        ['gnome-terminal', '--'],
-                        ['konsole', '-e'],
-                        ['xterm', '-e']
-                    ]
-                    
-                    # Try each terminal until one works
-                    for term_cmd in terminal_commands:
-                        try:
-                            process = subprocess.Popen(
-                                term_cmd + [result.executable_path],
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE
-                            )
-                            break
-                        except (subprocess.SubprocessError, FileNotFoundError):
-                            continue
-                    else:
-                        # If no terminal works, run directly
-                        process = subprocess.Popen(
-                            [result.executable_path],
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE
-                        )
+                    # On Unix, open in the first installed terminal, or run
+                    # directly if there is none
+                    terminal = find_terminal() or []
+                    process = subprocess.Popen(
+                        terminal + [result.executable_path],
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE
+                    )
                 
                 return result, process
             except Exception as e:
@@ -342,6 +657,58 @@ class Compiler:
         
         return result, None
     
+    def check_syntax(self, code, source_dir=None):
+        """
+        Check C code for errors without generating any output
+        
+        The code is fed to the compiler's stdin with -fsyntax-only, so only
+        parsing and semantic checks run. Only GCC and Clang are used.
+        
+        Args:
+            code (str): C source code
+            source_dir (str, optional): Directory of the file the code belongs
+                to, searched for its quoted includes
+        
+        Returns:
+            list: (line, message) pairs for each error
+        """
+        if not self.is_available():
+            return []
+        
+        compiler_name = os.path.basename(self.compiler_path)
+        if "gcc" not in compiler_name and "clang" not in compiler_name:
+            return []
+        
+        # Code read from stdin has no directory of its own, so local headers
+        # would not be found without pointing the compiler at it
+        cmd = [self.compiler_path, "-fsyntax-only", "-fdiagnostics-color=never"]
+        if source_dir:
+            cmd.extend(["-iquote", source_dir])
+        cmd.extend(["-x", "c", "-"])
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                input=code.encode("utf-8"),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=5
+            )
+        except (OSError, subprocess.SubprocessError):
+            return []
+        
+        # A clean parse leaves nothing to decode
+        errors = []
+        if result.returncode == 0:
+            return errors
+        
+        for line in result.stderr.decode("utf-8", "replace").splitlines():
+            match = _DIAGNOSTIC_RE.match(line)
+            if match and match.group(1) == "<stdin>" and match.group(4).endswith("error"):
+                errors.append((int(match.group(2)), match.group(5)))
+        
+        return errors
+    
     def analyze_code(self, source_path):
         """
         Perform static analysis on C source code
@@ -374,21 +741,20 @@ class Compiler:
             
             result = subprocess.run(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
-                text=True,
                 timeout=5
             )
             
-            # Parse output for warnings/errors
-            output = result.stderr.strip()
+            # Parse output for warnings/errors, decoding it only if there is any
+            output = result.stderr.decode("utf-8", "replace").strip() if result.stderr else ""
             
             for line in output.split('\n'):
                 if not line.strip():
                     continue
                 
                 # Parse the line for file:line:col: message format
-                match = re.search(r'(.*?):(\d+):(\d+):\s*(warning|error|note):\s*(.*)', line)
+                match = _DIAGNOSTIC_RE.search(line)
                 if match:
                     file_path, line_num, col_num, msg_type, message = match.groups()
                     
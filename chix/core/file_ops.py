@@ -12,6 +12,7 @@ import tempfile
 import mimetypes
 import time
 import uuid
+from chix.core.buffer_cache import get_code
 
 def new_file(state):
     """
@@ -54,6 +55,43 @@ def open_file(state, on_file_selected=None):
     
     return None
 
+def write_file_atomic(file_path, content, encoding="utf-8", sync=True):
+    """
+    Write text to a file so it is either fully replaced or left untouched
+    
+    The content goes to a temporary file next to the target, which is
+    flushed to disk and then renamed over it.
+    
+    Args:
+        file_path (str): Path to write
+        content (str): Text to write
+        encoding (str, optional): Text encoding; None for the locale default
+        sync (bool, optional): Wait for the data to reach the disk before
+            replacing the file
+    """
+    # Replace the file a symlink points to, not the link itself
+    file_path = os.path.realpath(file_path)
+    temp_path = file_path + ".tmp"
+    
+    try:
+        with open(temp_path, "w", encoding=encoding, buffering=1 << 16) as f:
+            f.write(content)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        
+        # Keep the permissions of the file being replaced
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
 def save_file(state, editor=None, file_path=None):
     """
     Save the current file
@@ -79,14 +117,13 @@ def save_file(state, editor=None, file_path=None):
     
     try:
         # Get content from editor
-        content = editor.get("1.0", "end-1c")
+        content = get_code(editor)
         
         # Create backup file
         backup_path = _create_backup(file_path)
         
         # Write to file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        write_file_atomic(file_path, content)
         
         # Update status message
         if "status_bar" in state:
@@ -125,7 +162,7 @@ def save_file_as(state, editor=None, file_path=None):
         return None
     
     # Get content from editor
-    content = editor.get("1.0", "end-1c")
+    content = get_code(editor)
     
     # Initial directory
     initial_dir = state.get("current_directory", os.getcwd())
@@ -156,8 +193,7 @@ def save_file_as(state, editor=None, file_path=None):
             state["current_directory"] = os.path.dirname(new_path)
             
             # Write to file
-            with open(new_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            write_file_atomic(new_path, content)
             
             # Update status message
             if "status_bar" in state:
@@ -403,8 +439,8 @@ def save_to_temp(content, file_id=None):
     temp_file = os.path.join(temp_dir, f"{file_id}.temp")
     
     try:
-        with open(temp_file, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Written on every edit, so not synced to disk each time
+        write_file_atomic(temp_file, content, sync=False)
         return temp_file
     except Exception as e:
         print(f"Error saving temporary file: {e}")
@@ -449,14 +485,15 @@ def clean_temp_files(max_age_hours=24):
     max_age_seconds = max_age_hours * 60 * 60
     
     try:
-        for filename in os.listdir(temp_dir):
-            if not filename.endswith(".temp"):
-                continue
+        # scandir entries carry their path, and on Windows their stat result
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".temp"):
+                    continue
+                    
+                file_age = current_time - entry.stat().st_mtime
                 
-            file_path = os.path.join(temp_dir, filename)
-            file_age = current_time - os.path.getmtime(file_path)
-            
-            if file_age > max_age_seconds:
-                os.unlink(file_path)
+                if file_age > max_age_seconds:
+                    os.unlink(entry.path)
     except Exception as e:
         print(f"Error cleaning temporary files: {e}")
@@ -10,6 +10,7 @@ import tempfile
 import time
 import threading
 import shutil
+from chix.core.compiler import find_terminal
 
 class InterpretationResult:
     """Stores the result of an interpretation operation"""
@@ -234,11 +235,10 @@ class Interpreter:
             
         except Exception as e:
             # Clean up if possible
-            if os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
+            try:
+                os.unlink(temp_file)
+            except OSError:
+                pass
             
             return InterpretationResult(
                 False,
@@ -273,28 +273,16 @@ class Interpreter:
                 cmd = f'start cmd /k "{self.tcc_path} -run {temp_file}"'
                 subprocess.Popen(cmd, shell=True)
             else:
-                # On Unix, try to open in a terminal
-                terminal_commands = [
-                    ['x-terminal-emulator', '-e'],
-                    ['gnome-terminal', '--'],
-                    ['konsole', '-e'],
-                    ['xterm', '-e']
-                ]
-                
-                # Try each terminal until one works
-                for term_cmd in terminal_commands:
-                    try:
-                        subprocess.Popen(
-                            term_cmd + [self.tcc_path, "-run", temp_file],
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE
-                        )
-                        break
-                    except (subprocess.SubprocessError, FileNotFoundError):
-                        continue
-                else:
-                    # If no terminal works, run directly
+                # On Unix, open in the first installed terminal
+                terminal = find_terminal()
+                if not terminal:
                     return False
+                
+                subprocess.Popen(
+                    terminal + [self.tcc_path, "-run", temp_file],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
             
             return True
             
@@ -8,8 +8,9 @@ import platform
 import subprocess
 import threading
 import time
-from chix.core.compiler import Compiler
+from chix.core.compiler import Compiler, find_terminal
 from chix.core.interpreter import Interpreter
+from chix.core.buffer_cache import get_code
 
 class Runner:
     """
@@ -24,7 +25,7 @@ class Runner:
             state (dict): Application state
         """
         self.state = state
-        self.compiler = Compiler()
+        self.compiler = Compiler(state.get("precompiled_headers", False))
         self.interpreter = Interpreter()
         self.current_process = None
         self.run_thread = None
@@ -49,36 +50,35 @@ class Runner:
             return False
         
         # Get code from editor
-        code = editor.get("1.0", "end-1c")
+        code = get_code(editor)
         
         # Clear output
         output.delete("1.0", "end")
         
-        # Get current file path or create a temporary file
+        # Get current file path; unsaved code is handed over in memory
         file_path = self.state.get("current_file")
-        if not file_path:
-            file_path = os.path.join("temp", "program.c")
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(code)
         
         # Choose run method based on mode
         if mode == "interpreter":
-            return self._run_interpreter(code, file_path, output)
-        else:
+            return self._run_interpreter(code, file_path or "program.c", output)
+        elif file_path:
             return self._run_compiler(file_path, output)
+        else:
+            return self._run_compiler(None, output, code=code)
     
-    def _run_compiler(self, file_path, output):
+    def _run_compiler(self, file_path, output, code=None):
         """
         Run code using the compiler
         
         Args:
             file_path (str): Path to the source file
             output (widget): Output widget for messages
+            code (str, optional): Unsaved code to compile instead of a file
         
         Returns:
             bool: True if successful, False otherwise
         """
-        if not file_path:
+        if not file_path and code is None:
             output.insert("end", "[ERROR] No file to compile.\n")
             return False
         
@@ -92,42 +92,49 @@ class Runner:
         output.insert("end", f"[INFO] {compiler_info}\n")
         
         # Make sure file exists
-        if not os.path.exists(file_path):
+        if code is None and not os.path.exists(file_path):
             output.insert("end", f"[ERROR] Source file not found: {file_path}\n")
             return False
         
+        # Optimized builds are opt-in; the compiler defaults to fast codegen
+        options = ["-O2"] if self.state.get("optimized_build", False) else None
+        
+        # Precompiled headers are opt-in and can be toggled between runs
+        self.compiler.use_precompiled_headers = self.state.get("precompiled_headers", False)
+        
         # Define a thread function to run compilation
         def compile_thread():
             # Start compilation
-            output.insert("end", f"[INFO] Compiling {os.path.basename(file_path)}...\n")
+            self._post_output(output, f"[INFO] Compiling {os.path.basename(file_path) if file_path else 'program.c'}...\n")
+            
+            # Compile the code, showing diagnostics as the compiler writes them
+            streamed = []
             
-            # Compile the code
-            result, process = self.compiler.compile_and_run(file_path)
+            def on_compiler_output(line):
+                streamed.append(line)
+                self._post_output(output, line)
+            
+            result, process = self.compiler.compile_and_run(file_path, options=options, on_output=on_compiler_output, code=code)
             
             # Store the process
             self.current_process = process
             
             # Display the result
             if result.success:
-                output.insert("end", "[SUCCESS] Compilation completed. Running program...\n")
+                self._post_output(output, "[SUCCESS] Compilation completed. Running program...\n")
                 
-                # Show warnings if any
-                if result.warnings:
-                    output.insert("end", "\n[WARNINGS]\n")
-                    for warning in result.warnings:
-                        output.insert("end", f"{warning}\n")
+                # Show warnings if any, unless they were already streamed
+                if result.warnings and not streamed:
+                    self._post_output(output, "\n[WARNINGS]\n" + "".join(f"{warning}\n" for warning in result.warnings))
             else:
-                output.insert("end", "[ERROR] Compilation failed:\n")
+                self._post_output(output, "[ERROR] Compilation failed.\n")
                 
-                # Show errors if any
-                if result.errors:
-                    for error in result.errors:
-                        output.insert("end", f"{error}\n")
-                else:
-                    output.insert("end", result.message + "\n")
-            
-            # Scroll to the end
-            output.see("end")
+                # Show the reason if the compiler printed none
+                if not streamed:
+                    if result.errors:
+                        self._post_output(output, "".join(f"{error}\n" for error in result.errors))
+                    else:
+                        self._post_output(output, result.message + "\n")
         
         # Run compilation in a separate thread
         self.run_thread = threading.Thread(target=compile_thread)
@@ -136,6 +143,23 @@ class Runner:
         
         return True
     
+    def _post_output(self, output, text):
+        """
+        Append text to the output widget from a worker thread
+        
+        Tk widgets may only be touched from the main thread, so the insert
+        is scheduled on its event loop.
+        
+        Args:
+            output (widget): Output widget for messages
+            text (str): Text to append
+        """
+        def append():
+            output.insert("end", text)
+            output.see("end")
+        
+        output.after(0, append)
+    
     def _run_interpreter(self, code, file_path, output):
         """
         Run code using the interpreter
@@ -160,27 +184,24 @@ class Runner:
         # Define a thread function to run interpretation
         def interpret_thread():
             # Start interpretation
-            output.insert("end", f"[INFO] Interpreting {os.path.basename(file_path)}...\n")
+            self._post_output(output, f"[INFO] Interpreting {os.path.basename(file_path)}...\n")
             
             # Interpret the code
             result = self.interpreter.interpret_code(code)
             
             # Display the result
             if result.success:
-                output.insert("end", "[SUCCESS] Program output:\n\n")
-                output.insert("end", result.output)
+                self._post_output(output, "[SUCCESS] Program output:\n\n")
+                self._post_output(output, result.output)
             else:
-                output.insert("end", "[ERROR] Interpretation failed:\n")
+                self._post_output(output, "[ERROR] Interpretation failed:\n")
                 
                 # Show errors if any
                 if result.errors:
                     for error in result.errors:
-                        output.insert("end", f"{error}\n")
+                        self._post_output(output, f"{error}\n")
                 else:
-                    output.insert("end", result.output + "\n")
-            
-            # Scroll to the end
-            output.see("end")
+                    self._post_output(output, result.output + "\n")
         
         # Run interpretation in a separate thread
         self.run_thread = threading.Thread(target=interpret_thread)
@@ -244,23 +265,10 @@ class Runner:
                     if platform.system() == "Windows":
                         subprocess.Popen(f'start cmd /k "{result.executable_path}"', shell=True)
                     else:
-                        # Try different terminal emulators
-                        terminal_commands = [
-                            ['x-terminal-emulator', '-e'],
-                            ['gnome-terminal', '--'],
-                            ['konsole', '-e'],
-                            ['xterm', '-e']
-                        ]
-                        
-                        for term_cmd in terminal_commands:
-                            try:
-                                subprocess.Popen(term_cmd + [result.executable_path])
-                                break
-                            except (subprocess.SubprocessError, FileNotFoundError):
-                                continue
-                        else:
-                            # If no terminal works, use basic command
-                            subprocess.Popen([result.executable_path])
+                        # Use the first installed terminal emulator, or the
+                        # basic command if there is none
+                        terminal = find_terminal() or []
+                        subprocess.Popen(terminal + [result.executable_path])
                     
                     output.insert("end", "[INFO] Running program in a new terminal...\n")
                     return True
@@ -73,8 +73,18 @@ class CommandPalette:
         # Register commands
         self.commands = self._register_commands()
         
-        # Current filtered commands
+        # Lowercased search text and listbox line of each command, built once
+        self._search_keys = [
+            f"{cmd['name']}\n{cmd['description']}".lower() for cmd in self.commands
+        ]
+        self._display_lines = [
+            f"{cmd['name']} - {cmd['description']} ({cmd['shortcut']})" for cmd in self.commands
+        ]
+        
+        # Current filtered commands, their indices and the query they match
         self.filtered_commands = []
+        self._filtered_indices = []
+        self._last_search = None
     
     def _register_commands(self):
         """Register all available commands"""
@@ -185,19 +195,26 @@ class CommandPalette:
         """Filter commands based on search text"""
         search_text = self.search_var.get().lower()
         
-        # Clear listbox
-        self.listbox.delete(0, tk.END)
+        # Arrow keys and other non-editing keys leave the query unchanged
+        if search_text == self._last_search:
+            return
+        
+        # A query extending the previous one can only match a subset of its
+        # matches, so only those need testing
+        if self._last_search is not None and search_text.startswith(self._last_search):
+            candidates = self._filtered_indices
+        else:
+            candidates = range(len(self.commands))
         
         # Filter commands
-        self.filtered_commands = []
-        for cmd in self.commands:
-            if (search_text in cmd["name"].lower() or 
-                search_text in cmd["description"].lower()):
-                self.filtered_commands.append(cmd)
-                
-                # Format display string
-                display = f"{cmd['name']} - {cmd['description']} ({cmd['shortcut']})"
-                self.listbox.insert(tk.END, display)
+        self._filtered_indices = [i for i in candidates if search_text in self._search_keys[i]]
+        self.filtered_commands = [self.commands[i] for i in self._filtered_indices]
+        self._last_search = search_text
+        
+        # Refill the listbox in a single insert call
+        self.listbox.delete(0, tk.END)
+        if self._filtered_indices:
+            self.listbox.insert(tk.END, *[self._display_lines[i] for i in self._filtered_indices])
         
         # Select first item if available
         if self.listbox.size() > 0:
@@ -282,6 +299,7 @@ class CommandPalette:
         self.search_entry.focus_set()
         
         # Load all commands
+        self._last_search = None
         self.filter_commands()
     
     def hide(self, event=None):
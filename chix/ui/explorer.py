@@ -5,10 +5,56 @@ File explorer panel for ChiX Editor
 import customtkinter as ctk
 import tkinter as tk
 import os
-from chix.ui.theme import get_color
-from chix.ui.widgets import ClickableLabel
+import asyncio
+import threading
+from chix.ui.theme import get_color, get_theme
 from chix.utils.git_manager import GitManager
-import re
+import math
+from collections import deque
+
+# Height of a single row in the tree view (pixels)
+ROW_HEIGHT = 22
+
+# Horizontal indentation per tree level (pixels)
+INDENT_WIDTH = 20
+
+# Number of children shown per directory before a "Show more" row
+CHILDREN_PAGE_SIZE = 200
+
+# Icons for directories and files without a specific icon
+_DIR_ICON = "📁"
+_DEFAULT_ICON = "📄"
+
+# Map file extensions to icons
+_FILE_ICONS = {
+    ".c": "©️",    # C file
+    ".h": "🔤",    # Header file
+    ".cpp": "➕",  # C++ file
+    ".txt": "📝",  # Text file
+    ".md": "📑",   # Markdown
+    ".py": "🐍",   # Python
+    ".exe": "⚙️",  # Executable
+    ".json": "🔠", # JSON
+    ".xml": "🔣",  # XML
+    ".html": "🌐", # HTML
+}
+
+# Same table with upper- and title-case spellings (".C", ".Md", ...) so
+# lookups need no lowercasing in the common cases
+_FILE_ICONS_CI = {}
+for _ext, _icon in _FILE_ICONS.items():
+    for _variant in (_ext, _ext.upper(), _ext.title()):
+        _FILE_ICONS_CI[_variant] = _icon
+del _ext, _icon, _variant
+
+# Contents written to files created from the explorer
+_NEW_FILE_TEMPLATE = """#include <stdio.h>
+
+int main() {
+    printf("Hello, World!\\n");
+    return 0;
+}
+"""
 
 class FileTreeNode:
     """Represents a node in the file tree"""
@@ -20,27 +66,102 @@ class FileTreeNode:
         self.parent = parent
         self.children = []
         self.expanded = False
+        self.loaded = False
+        self.mtime_ns = None
+        self.shown_count = CHILDREN_PAGE_SIZE
     
     def add_child(self, child):
         """Add a child node"""
         self.children.append(child)
     
-    def get_children(self):
-        """Get sorted children (directories first, then files)"""
-        dirs = [c for c in self.children if c.is_dir]
-        files = [c for c in self.children if not c.is_dir]
+    def load_children(self):
+        """Read this directory's entries the first time they are needed"""
+        if self.loaded or not self.is_dir:
+            return
         
-        # Sort directories and files alphabetically
-        dirs.sort(key=lambda x: x.name.lower())
-        files.sort(key=lambda x: x.name.lower())
+        self.loaded = True
+        self.children = []
         
-        return dirs + files
+        try:
+            # Remember when the listing was taken so refreshes can skip it
+            self.mtime_ns = os.stat(self.path).st_mtime_ns
+            
+            # A single scandir pass gives names and types without a stat per entry,
+            # filtering out system files and unwanted directories
+            with os.scandir(self.path) as it:
+                entries = [
+                    (entry.is_dir(follow_symlinks=False), entry)
+                    for entry in it
+                    if not entry.name.startswith('.')
+                ]
+            
+            # Sort once here (directories first, then files) so that
+            # get_children can hand out the list as-is
+            entries.sort(key=lambda item: (not item[0], item[1].name.lower()))
+            
+            for is_dir, entry in entries:
+                self.add_child(FileTreeNode(entry.path, is_dir, self))
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            # Skip directories we can't access
+            pass
+    
+    def reload_if_changed(self):
+        """
+        Re-read a loaded directory if it changed on disk since it was listed
+        
+        Child nodes that still exist are kept, along with their expanded
+        state and any children already loaded below them.
+        
+        Returns:
+            bool: True if the directory was re-read
+        """
+        if not self.loaded:
+            return False
+        
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        if mtime_ns is not None and mtime_ns == self.mtime_ns:
+            return False
+        
+        previous = {child.path: child for child in self.children}
+        self.loaded = False
+        self.load_children()
+        
+        # Swap fresh nodes for the existing ones wherever the entry survived
+        for i, child in enumerate(self.children):
+            old = previous.get(child.path)
+            if old is not None and old.is_dir == child.is_dir:
+                self.children[i] = old
+        
+        return True
+    
+    def has_children(self):
+        """Check whether the node may have children to expand"""
+        return self.is_dir and (not self.loaded or bool(self.children))
+    
+    def get_children(self):
+        """Get sorted children (directories first, then files)"""
+        return self.children
     
     def toggle_expanded(self):
         """Toggle expanded state"""
         self.expanded = not self.expanded
         return self.expanded
 
+class ShowMoreRow:
+    """Placeholder row standing in for the children of a directory not yet shown"""
+    
+    def __init__(self, parent):
+        self.parent = parent
+        self.remaining = len(parent.children) - parent.shown_count
+    
+    def has_children(self):
+        """Placeholder rows never expand"""
+        return False
+
 class FileExplorer(ctk.CTkFrame):
     """
     File explorer panel showing directory structure
@@ -53,15 +174,39 @@ class FileExplorer(ctk.CTkFrame):
         self.root_path = state.get("current_directory", os.getcwd())
         self.tree_root = None
         
+        # Flattened list of (node, depth) rows currently shown in the tree
+        self.visible_rows = []
+        
+        # Pending mouse wheel movement, flushed once per idle cycle
+        self._scroll_delta = 0.0
+        self._scroll_pending = False
+        
+        # Index of the row currently highlighted under the mouse
+        self._hover_row = None
+        
+        # Range of row indexes currently drawn on the canvas
+        self._drawn_rows = range(0)
+        
         # Initialize Git manager
         self.git_manager = GitManager(self.root_path)
         self.show_git_status = True
+        self._is_git_repo = self.git_manager.is_git_repo()
+        self._branch_name = None
+        
+        # File status per repository-relative path, refreshed once per load
+        self._git_status_cache = {}
+        
+        # Incremented per load so stale background status results are dropped
+        self._status_generation = 0
+        
+        # Active theme colors, refreshed once per load
+        self._theme = get_theme()
         
         # Create UI elements
         self._create_widgets()
         
-        # Load initial directory
-        self.load_directory(self.root_path)
+        # Load initial directory once the window has been painted
+        self.after(0, lambda: self.load_directory(self.root_path))
     
     def _create_widgets(self):
         """Create all UI widgets"""
@@ -141,7 +286,7 @@ class FileExplorer(ctk.CTkFrame):
         self.git_toggle_btn.pack(side="right", padx=5)
         
         # Hide branch frame if not a git repository
-        if not self.git_manager.is_git_repo():
+        if not self._is_git_repo:
             self.branch_frame.pack_forget()
         
         # Path display/selector
@@ -168,49 +313,135 @@ class FileExplorer(ctk.CTkFrame):
         tree_frame = ctk.CTkFrame(self, fg_color="transparent")
         tree_frame.pack(fill="both", expand=True, padx=2, pady=2)
         
-        # Scrollable container
+        # Canvas the tree rows are drawn on directly
         self.canvas = ctk.CTkCanvas(
             tree_frame,
             bg=get_color("bg_primary"),
-            highlightthickness=0
+            highlightthickness=0,
+            yscrollincrement=ROW_HEIGHT,
+            cursor="hand2"
         )
-        scrollbar = ctk.CTkScrollbar(tree_frame, command=self.canvas.yview)
+        scrollbar = ctk.CTkScrollbar(tree_frame, command=self._on_scrollbar)
         self.canvas.configure(yscrollcommand=scrollbar.set)
         
         # Pack canvas and scrollbar
         scrollbar.pack(side="right", fill="y")
         self.canvas.pack(side="left", fill="both", expand=True)
         
-        # Create tree container frame
-        self.tree_frame = ctk.CTkFrame(self.canvas, fg_color=get_color("bg_primary"))
-        self.canvas_window = self.canvas.create_window(
-            (0, 0),
-            window=self.tree_frame,
-            anchor="nw",
-            tags="tree"
+        # Single hover highlight, moved between rows instead of per-row bindings
+        self._hover_item = self.canvas.create_rectangle(
+            0, 0, 0, 0,
+            fill=self._theme["bg_hover"],
+            width=0,
+            state="hidden",
+            tags="hover"
         )
         
-        # Configure canvas and frame events
-        self.tree_frame.bind("<Configure>", self._on_tree_frame_configure)
+        # Configure canvas events
         self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.canvas.bind("<Button-1>", self._on_canvas_click)
+        self.canvas.bind("<Motion>", self._on_canvas_motion)
+        self.canvas.bind("<Leave>", lambda e: self._set_hover_row(None))
         
         # Bind mouse wheel scrolling
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
     
-    def _on_tree_frame_configure(self, event):
-        """Handle tree frame size changes"""
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-    
     def _on_canvas_configure(self, event):
         """Handle canvas size changes"""
-        # Update the width of the window to fill the canvas
-        self.canvas.itemconfig("tree", width=event.width)
+        self._update_scrollregion()
+        self._draw_visible_rows()
+    
+    def _on_scrollbar(self, *args):
+        """Handle scrollbar dragging"""
+        self.canvas.yview(*args)
+        self._draw_visible_rows()
     
     def _on_mousewheel(self, event):
         """Handle mousewheel scrolling"""
         # Only scroll if mouse is over the canvas
-        if event.widget == self.canvas:
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        if event.widget != self.canvas:
+            return
+        
+        # Accumulate wheel ticks and apply them together when Tk is idle
+        self._scroll_delta += -event.delta / 120
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            self.after_idle(self._flush_scroll)
+    
+    def _flush_scroll(self):
+        """Apply the accumulated mouse wheel movement and redraw once"""
+        delta = int(self._scroll_delta)
+        self._scroll_delta -= delta
+        self._scroll_pending = False
+        
+        if delta:
+            self.canvas.yview_scroll(delta, "units")
+            self._draw_visible_rows()
+            
+            # The row under the mouse changed, so hide the stale highlight
+            self._set_hover_row(None)
+    
+    def _on_canvas_click(self, event):
+        """Map a click on the canvas back to the tree row under the cursor"""
+        index = int(self.canvas.canvasy(event.y)) // ROW_HEIGHT
+        if index < 0 or index >= len(self.visible_rows):
+            return
+        
+        node, depth = self.visible_rows[index]
+        
+        if isinstance(node, ShowMoreRow):
+            self._show_more(node, index)
+            return
+        
+        # Clicks on the expander arrow toggle the directory in place
+        expander_right = depth * INDENT_WIDTH + INDENT_WIDTH
+        if node.has_children() and event.x < expander_right:
+            self._toggle_node(node, index)
+        else:
+            self._on_node_click(node)
+    
+    def _on_canvas_motion(self, event):
+        """Highlight the row under the mouse"""
+        index = int(self.canvas.canvasy(event.y)) // ROW_HEIGHT
+        if index < 0 or index >= len(self.visible_rows):
+            index = None
+        
+        if index != self._hover_row:
+            self._set_hover_row(index)
+    
+    def _set_hover_row(self, index):
+        """Move the hover highlight to a row, or hide it when index is None"""
+        self._hover_row = index
+        
+        if index is None:
+            self.canvas.itemconfigure(self._hover_item, state="hidden")
+            return
+        
+        top = index * ROW_HEIGHT
+        self.canvas.coords(self._hover_item, 0, top, self.canvas.winfo_width(), top + ROW_HEIGHT)
+        self.canvas.itemconfigure(self._hover_item, state="normal")
+    
+    def _show_message(self, text, duration=3000):
+        """
+        Show a message at the top of the tree view
+        
+        Args:
+            text (str): Message to display
+            duration (int, optional): Milliseconds before the message is removed,
+                or None to keep it until the tree is reloaded
+        """
+        item = self.canvas.create_text(
+            10,
+            self.canvas.canvasy(0) + ROW_HEIGHT // 2,
+            text=text,
+            anchor="w",
+            fill=get_color("error"),
+            font=("Arial", 11),
+            tags="message"
+        )
+        
+        if duration:
+            self.after(duration, lambda: self.canvas.delete(item))
     
     def _go_to_path(self):
         """Go to the path entered in the path entry"""
@@ -218,16 +449,8 @@ class FileExplorer(ctk.CTkFrame):
         if os.path.exists(path) and os.path.isdir(path):
             self.load_directory(path)
         else:
-            # Show error message
-            error_label = ctk.CTkLabel(
-                self.tree_frame,
-                text=f"Invalid path: {path}",
-                text_color=get_color("error")
-            )
-            error_label.pack(padx=10, pady=10)
-            
-            # Remove error after 3 seconds
-            self.after(3000, error_label.destroy)
+            # Show error message for 3 seconds
+            self._show_message(f"Invalid path: {path}")
     
     def _new_file(self):
         """Create a new file in the current directory"""
@@ -256,13 +479,7 @@ class FileExplorer(ctk.CTkFrame):
                 
                 # Create empty file
                 with open(file_path, "w") as f:
-                    f.write("""#include <stdio.h>
-
-int main() {
-    printf("Hello, World!\\n");
-    return 0;
-}
-""")
+                    f.write(_NEW_FILE_TEMPLATE)
                 
                 # Refresh the view
                 self._refresh()
@@ -272,26 +489,44 @@ int main() {
                     self.state["main_panel"].tab_view.open_file(file_path)
                 
             except Exception as e:
-                # Show error
-                error_label = ctk.CTkLabel(
-                    self.tree_frame,
-                    text=f"Error creating file: {str(e)}",
-                    text_color=get_color("error")
-                )
-                error_label.pack(padx=10, pady=10)
-                
-                # Remove error after 3 seconds
-                self.after(3000, error_label.destroy)
+                # Show error for 3 seconds
+                self._show_message(f"Error creating file: {str(e)}")
     
     def _refresh(self):
         """Refresh the current directory view"""
-        self.load_directory(self.path_var.get())
+        path = self.path_var.get()
+        
+        # A different root needs a full load
+        if self.tree_root is None or path != self.root_path:
+            self.load_directory(path)
+            return
+        
+        # Pick up the active theme colors
+        self._theme = get_theme()
+        self.canvas.itemconfigure(self._hover_item, fill=self._theme["bg_hover"])
+        
+        # Otherwise only re-read loaded directories whose mtime changed
+        changed = False
+        stack = deque([self.tree_root])
+        while stack:
+            node = stack.pop()
+            changed |= node.reload_if_changed()
+            stack.extend(child for child in node.children if child.loaded)
+        
+        if changed:
+            self._render_tree()
+        
+        # Git status can change without touching directory mtimes
+        self._start_status_refresh()
     
     def load_directory(self, path):
         """Load and display a directory structure"""
         # Clear existing tree
-        for widget in self.tree_frame.winfo_children():
-            widget.destroy()
+        self.tree_root = None
+        self.visible_rows = []
+        self.canvas.delete("row", "message")
+        self.canvas.yview_moveto(0)
+        self._set_hover_row(None)
         
         # Update path
         self.root_path = path
@@ -299,59 +534,66 @@ int main() {
         
         # Check if path exists
         if not os.path.exists(path):
-            ctk.CTkLabel(
-                self.tree_frame,
-                text=f"Path not found: {path}",
-                text_color=get_color("error")
-            ).pack(padx=10, pady=10)
+            self._update_scrollregion()
+            self._show_message(f"Path not found: {path}", duration=None)
             return
         
+        # Pick up the active theme colors
+        self._theme = get_theme()
+        self.canvas.itemconfigure(self._hover_item, fill=self._theme["bg_hover"])
+        
         # Build the file tree
         self.tree_root = self._build_tree(path)
         
         # Display the tree
         self._render_tree()
-    
-    def _build_tree(self, root_path, max_depth=3):
-        """Build a tree representation of the directory structure"""
-        root_node = FileTreeNode(root_path, is_dir=True)
         
-        # Queue for BFS traversal with depth tracking
-        queue = []  # Using a list for the queue
-        queue.append((root_node, 0))  # (node, depth)
+        # Query git status once for the whole tree in the background
+        self._git_status_cache = {}
+        self._start_status_refresh()
+    
+    def _start_status_refresh(self):
+        """Query git status for the tree on a background thread"""
+        self._status_generation += 1
+        if self._is_git_repo and self.show_git_status:
+            threading.Thread(
+                target=self._load_status_map,
+                args=(self._status_generation,),
+                daemon=True
+            ).start()
+        elif self._git_status_cache:
+            # Status display was switched off; drop the old colors
+            self._git_status_cache = {}
+            self._recolor_drawn_rows()
+    
+    def _load_status_map(self, generation):
+        """Run git status off the main thread and hand the result back to Tk"""
+        # Branch and status queries run concurrently
+        try:
+            branch, status_map = asyncio.run(self.git_manager.refresh_all())
+        except Exception:
+            branch, status_map = None, {}
+        
+        self.after(0, self._apply_status_map, generation, status_map, branch)
+    
+    def _apply_status_map(self, generation, status_map, branch=None):
+        """Store a git status result and recolor the rows in view"""
+        # Ignore results for a directory that is no longer loaded
+        if generation != self._status_generation:
+            return
         
-        while queue:
-            node_info = queue.pop(0)
-            node = node_info[0]
-            depth = node_info[1]
-            
-            # Don't go deeper than max_depth
-            if depth > max_depth:
-                continue
-            
-            try:
-                # List directory contents
-                if node.is_dir and os.path.exists(node.path):
-                    items = os.listdir(node.path)
-                    
-                    # Filter out system files and unwanted directories
-                    items = [item for item in items if not item.startswith('.')]
-                    
-                    for item in items:
-                        item_path = os.path.join(node.path, item)
-                        is_dir = os.path.isdir(item_path)
-                        
-                        # Create child node
-                        child = FileTreeNode(item_path, is_dir, node)
-                        node.add_child(child)
-                        
-                        # Add directories to queue for further expansion
-                        if is_dir:
-                            queue.append((child, depth + 1))
-            except (PermissionError, FileNotFoundError):
-                # Skip directories we can't access
-                pass
+        self._git_status_cache = status_map
+        self._recolor_drawn_rows()
         
+        # Pick up branch switches made outside the editor
+        if branch is not None and branch != self._branch_name:
+            self._branch_name = branch
+            self.branch_label.configure(text=self._get_branch_name())
+    
+    def _build_tree(self, root_path):
+        """Build the tree root; deeper levels are loaded when expanded"""
+        root_node = FileTreeNode(root_path, is_dir=True)
+        root_node.load_children()
         return root_node
     
     def _render_tree(self):
@@ -362,82 +604,169 @@ int main() {
         # Set default expansion for root
         self.tree_root.expanded = True
         
-        # Start rendering from root
-        self._render_node(self.tree_root, self.tree_frame, 0)
+        # Flatten the expanded part of the tree and draw the rows in view
+        self.visible_rows = self._flatten_node(self.tree_root, 0)
+        self._update_scrollregion()
+        self._draw_visible_rows()
     
-    def _render_node(self, node, parent_frame, depth):
-        """Render a single node and its children if expanded"""
-        # Create frame for this node
-        node_frame = ctk.CTkFrame(parent_frame, fg_color="transparent")
-        node_frame.pack(fill="x", pady=1)
+    def _flatten_node(self, node, depth):
+        """Return (node, depth) rows for a node and its expanded descendants"""
+        rows = []
+        
+        # Walk depth-first with an explicit stack; children are pushed in
+        # reverse so they come back out in display order
+        stack = deque([(node, depth)])
+        while stack:
+            node, depth = stack.pop()
+            rows.append((node, depth))
+            
+            if isinstance(node, FileTreeNode) and node.is_dir and node.expanded:
+                stack.extend(reversed(self._child_rows(node, 0, depth + 1)))
         
-        # Indent based on depth
-        indent_frame = ctk.CTkFrame(node_frame, width=depth*20, fg_color="transparent")
-        indent_frame.pack(side="left")
+        return rows
+    
+    def _child_rows(self, node, start, depth):
+        """
+        Get the rows for a directory's shown children from a given position
+        
+        Args:
+            node (FileTreeNode): Expanded directory node
+            start (int): Index of the first child to include
+            depth (int): Depth of the child rows
+            
+        Returns:
+            list: (child, depth) rows, ending with a ShowMoreRow if some
+                children are still hidden
+        """
+        children = node.get_children()
+        rows = [(child, depth) for child in children[start:node.shown_count]]
         
-        # Expansion indicator (only for directories)
-        if node.is_dir and node.children:
-            icon = "▼" if node.expanded else "▶"
-            expander = ctk.CTkButton(
-                node_frame,
-                text=icon,
-                width=20,
-                height=20,
-                fg_color="transparent",
-                hover_color=get_color("bg_hover"),
-                command=lambda n=node, nf=node_frame: self._toggle_node(n, nf, depth)
-            )
-            expander.pack(side="left")
-        else:
-            # Spacer for alignment
-            spacer = ctk.CTkFrame(node_frame, width=20, fg_color="transparent")
-            spacer.pack(side="left")
+        if len(children) > node.shown_count:
+            rows.append((ShowMoreRow(node), depth))
         
-        # Icon based on file type
-        icon = self._get_file_icon(node)
-        icon_label = ctk.CTkLabel(node_frame, text=icon, width=20)
-        icon_label.pack(side="left")
+        return rows
+    
+    def _show_more(self, row, index):
+        """Replace a "Show more" row with the next page of children"""
+        node = row.parent
+        depth = self.visible_rows[index][1]
+        start = node.shown_count
+        node.shown_count += CHILDREN_PAGE_SIZE
+        
+        # Newly shown children are collapsed, so each contributes one row
+        self.visible_rows[index:index + 1] = self._child_rows(node, start, depth)
+        
+        self._update_scrollregion()
+        self._draw_visible_rows()
+    
+    def _update_scrollregion(self):
+        """Size the scrollable area to fit every visible row"""
+        total_height = len(self.visible_rows) * ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), total_height))
+    
+    def _draw_visible_rows(self):
+        """Draw only the rows that intersect the viewport"""
+        self.canvas.delete("row")
+        self._drawn_rows = range(0)
+        
+        if not self.visible_rows:
+            return
         
-        # Check git status to determine text color
-        text_color = get_color("fg_primary")
-        if self.git_manager.is_git_repo() and self.show_git_status:
+        # Work out which slice of rows is on screen
+        first = max(0, int(self.canvas.canvasy(0)) // ROW_HEIGHT)
+        last = first + math.ceil(self.canvas.winfo_height() / ROW_HEIGHT) + 2
+        self._drawn_rows = range(first, min(last, len(self.visible_rows)))
+        
+        for index in self._drawn_rows:
+            node, depth = self.visible_rows[index]
+            self._draw_row(index, node, depth)
+    
+    def _recolor_drawn_rows(self):
+        """Update the name colors of the rows on screen without redrawing them"""
+        for index in self._drawn_rows:
+            node = self.visible_rows[index][0]
+            if isinstance(node, FileTreeNode):
+                self.canvas.itemconfigure(f"label{index}", fill=self._get_label_color(node))
+    
+    def _get_label_color(self, node):
+        """Get the text color of a row name, using git status when available"""
+        if self._is_git_repo and self.show_git_status:
             status_color = self._get_file_status_color(node.path)
             if status_color:
-                text_color = status_color
+                return status_color
+        return self._theme["fg_primary"]
+    
+    def _draw_row(self, index, node, depth):
+        """Draw a single tree row"""
+        theme = self._theme
+        y = index * ROW_HEIGHT + ROW_HEIGHT // 2
+        x = depth * INDENT_WIDTH
+        
+        # Placeholder for the hidden children of a large directory
+        if isinstance(node, ShowMoreRow):
+            self.canvas.create_text(
+                x + INDENT_WIDTH + 4, y,
+                text=f"Show {node.remaining} more…",
+                anchor="w",
+                fill=theme["accent_primary"],
+                font=("Arial", 11, "italic"),
+                tags="row"
+            )
+            return
+        
+        # Expansion indicator (only for directories)
+        if node.has_children():
+            self.canvas.create_text(
+                x + INDENT_WIDTH // 2, y,
+                text="▼" if node.expanded else "▶",
+                fill=theme["fg_secondary"],
+                font=("Arial", 9),
+                tags="row"
+            )
+        
+        # Icon based on file type
+        self.canvas.create_text(
+            x + INDENT_WIDTH + INDENT_WIDTH // 2, y,
+            text=self._get_file_icon(node),
+            font=("Arial", 11),
+            tags="row"
+        )
         
-        # Node name as clickable label
-        node_label = ClickableLabel(
-            node_frame,
+        # Node name, tagged per row so it can be recolored in place
+        self.canvas.create_text(
+            x + 2 * INDENT_WIDTH + 4, y,
             text=node.name,
             anchor="w",
-            text_color=text_color,
-            command=lambda n=node: self._on_node_click(n)
+            fill=self._get_label_color(node),
+            font=("Arial", 11),
+            tags=("row", f"label{index}")
         )
-        node_label.pack(side="left", fill="x", expand=True, padx=2)
-        
-        # Render children if expanded
-        if node.is_dir and node.expanded:
-            children_frame = ctk.CTkFrame(parent_frame, fg_color="transparent")
-            children_frame.pack(fill="x")
-            
-            for child in node.get_children():
-                self._render_node(child, children_frame, depth + 1)
     
-    def _toggle_node(self, node, node_frame, depth):
-        """Toggle expansion state of a node"""
-        # Toggle expanded state
-        node.toggle_expanded()
-        
-        # Get the parent frame of this node
-        parent_frame = node_frame.master
-        
-        # Remove all widgets after this node
-        node_idx = parent_frame.winfo_children().index(node_frame)
-        for widget in parent_frame.winfo_children()[node_idx+1:]:
-            widget.destroy()
-        
-        # Re-render this node and its children
-        self._render_node(node, parent_frame, depth)
+    def _toggle_node(self, node, index):
+        """
+        Toggle expansion state of a node
+        
+        Args:
+            node (FileTreeNode): Directory node being toggled
+            index (int): Position of the node in the visible rows
+        """
+        depth = self.visible_rows[index][1]
+        
+        if node.toggle_expanded():
+            # Read the directory on first expansion and splice its
+            # expanded subtree in right below the node
+            node.load_children()
+            self.visible_rows[index + 1:index + 1] = self._flatten_node(node, depth)[1:]
+        else:
+            # Drop the rows of every descendant currently shown
+            end = index + 1
+            while end < len(self.visible_rows) and self.visible_rows[end][1] > depth:
+                end += 1
+            del self.visible_rows[index + 1:end]
+        
+        # Redraw the viewport
+        self._update_scrollregion()
+        self._draw_visible_rows()
     
     def _on_node_click(self, node):
         """Handle node click event"""
@@ -451,21 +780,27 @@ int main() {
     
     def _get_branch_name(self):
         """Get current git branch name"""
-        if not self.git_manager.is_git_repo():
+        if not self._is_git_repo:
             return "No Git Repository"
         
-        branch = self.git_manager.get_current_branch()
-        if branch:
-            return branch
-        return "No Branch"
+        # Branch lookups spawn git, so keep the answer until the next refresh
+        if self._branch_name is None:
+            self._branch_name = self.git_manager.get_current_branch() or ""
+        
+        return self._branch_name or "No Branch"
     
     def _refresh_git_status(self):
         """Refresh git status information"""
+        # Drop the cached repository state, branch name and status
+        self._is_git_repo = self.git_manager.is_git_repo()
+        self._branch_name = None
+        self.git_manager.invalidate()
+        
         # Update the branch name
         self.branch_label.configure(text=self._get_branch_name())
         
         # Show/hide branch frame based on git repo status
-        if self.git_manager.is_git_repo():
+        if self._is_git_repo:
             self.branch_frame.pack(fill="x", side="top", after=self.canvas)
         else:
             self.branch_frame.pack_forget()
@@ -480,20 +815,17 @@ int main() {
     
     def _get_file_status_color(self, node_path):
         """Get color for file based on git status"""
-        if not self.git_manager.is_git_repo() or not self.show_git_status:
+        if not self._is_git_repo or not self.show_git_status:
             return None
         
-        # Try to get relative path
-        if self.root_path and os.path.isabs(node_path):
-            try:
-                rel_path = os.path.relpath(node_path, self.root_path)
-            except ValueError:
-                # File is outside repository
-                return None
-        else:
-            rel_path = node_path
+        # Status paths are relative to the repository root
+        try:
+            rel_path = os.path.relpath(node_path, self.git_manager.repo_path)
+        except ValueError:
+            # File is outside repository
+            return None
         
-        status = self.git_manager.get_file_status(rel_path)
+        status = self._git_status_cache.get(rel_path)
         if status == "modified":
             return "#e2c08d"  # Yellow-orange color for modified
         elif status == "untracked":
@@ -508,31 +840,11 @@ int main() {
     def _get_file_icon(self, node):
         """Get an appropriate icon for a file type"""
         if node.is_dir:
-            return "📁"  # Folder icon
-            
-        # Get file extension
-        _, ext = os.path.splitext(node.name)
-        ext = ext.lower()
-        
-        # Map extensions to icons
-        icons = {
-            ".c": "©️",    # C file
-            ".h": "🔤",    # Header file
-            ".cpp": "➕",  # C++ file
-            ".txt": "📝",  # Text file
-            ".md": "📑",   # Markdown
-            ".py": "🐍",   # Python
-            ".exe": "⚙️",  # Executable
-            ".json": "🔠", # JSON
-            ".xml": "🔣",  # XML
-            ".html": "🌐", # HTML
-        }
-        
-        # Check git status and add indicator
-        status_color = self._get_file_status_color(node.path)
-        if status_color:
-            # If we have git status, we could modify the icon or add a status character
-            # but for simplicity, we'll just use the normal icon and color it in the node label
-            pass
-        
-        return icons.get(ext, "📄")  # Default file icon
+            return _DIR_ICON
+        
+        ext = os.path.splitext(node.name)[1]
+        icon = _FILE_ICONS_CI.get(ext)
+        if icon is None:
+            # Fall back for unusual mixed-case spellings such as ".cPp"
+            icon = _FILE_ICONS.get(ext.lower(), _DEFAULT_ICON)
+        return icon
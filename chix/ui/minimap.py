@@ -5,8 +5,16 @@ Minimap implementation for code overview
 import customtkinter as ctk
 import tkinter as tk
 from chix.ui.theme import get_color
+from chix.core.buffer_cache import get_code
 import re
 
+# Line classification patterns used when drawing the minimap
+_PREPROCESSOR_RE = re.compile(r'^\s*#')
+_LINE_COMMENT_RE = re.compile(r'^\s*\/\/')
+_BLOCK_COMMENT_START_RE = re.compile(r'^\s*\/\*')
+_BLOCK_COMMENT_END_RE = re.compile(r'^.*\*\/\s*$')
+_FUNCTION_RE = re.compile(r'(int|void|char|float|double|struct|enum)\s+\w+\s*\(')
+
 class Minimap(ctk.CTkCanvas):
     """
     Minimap widget showing a small version of the code for navigation
@@ -50,7 +58,7 @@ class Minimap(ctk.CTkCanvas):
         )
         
         # Get editor content
-        content = self.editor.get("1.0", "end-1c")
+        content = get_code(self.editor)
         lines = content.split("\n")
         
         # Calculate line height in minimap
@@ -68,15 +76,15 @@ class Minimap(ctk.CTkCanvas):
                 continue
             
             # Determine line color based on content
-            if re.match(r'^\s*#', line):  # Preprocessor directive
+            if _PREPROCESSOR_RE.match(line):  # Preprocessor directive
                 fill_color = get_color("type")
-            elif re.match(r'^\s*\/\/', line):  # Comment
+            elif _LINE_COMMENT_RE.match(line):  # Comment
                 fill_color = get_color("comment")
-            elif re.match(r'^\s*\/\*', line):  # Block comment start
+            elif _BLOCK_COMMENT_START_RE.match(line):  # Block comment start
                 fill_color = get_color("comment")
-            elif re.match(r'^.*\*\/\s*$', line):  # Block comment end
+            elif _BLOCK_COMMENT_END_RE.match(line):  # Block comment end
                 fill_color = get_color("comment")
-            elif re.search(r'(int|void|char|float|double|struct|enum)\s+\w+\s*\(', line):  # Function
+            elif _FUNCTION_RE.search(line):  # Function
                 fill_color = get_color("function")
             elif "{" in line or "}" in line:  # Braces
                 fill_color = get_color("operator")
@@ -138,7 +146,7 @@ class Minimap(ctk.CTkCanvas):
         line_number = int(y_position / line_height) + 1
         
         # Get total lines
-        content = self.editor.get("1.0", "end-1c")
+        content = get_code(self.editor)
         total_lines = content.count('\n') + 1
         
         # Ensure line number is valid
@@ -9,8 +9,19 @@ from chix.ui.widgets import ToolbarButton, ToolbarSeparator
 from chix.ui.theme import get_color
 from chix.ui.minimap import Minimap
 from chix.core.file_ops import new_file, open_file, save_file, save_file_as
+from chix.core.buffer_cache import get_code
 import os
 
+# Code placed in new untitled tabs
+_STARTER_CODE = """#include <stdio.h>
+
+int main() {
+    // Your code here
+    printf("Hello, World!\\n");
+    return 0;
+}
+"""
+
 class MainPanelView:
     """Main panel view that contains editor and output"""
     
@@ -182,6 +193,37 @@ class MainPanelView:
         )
         mode_dropdown.pack(side="left", padx=5)
         
+        # Optimized build toggle
+        optimize_var = tk.BooleanVar(value=self.state.get("optimized_build", False))
+        
+        def on_optimize_change():
+            self.state["optimized_build"] = optimize_var.get()
+        
+        optimize_check = ctk.CTkCheckBox(
+            run_frame,
+            text="Optimize",
+            variable=optimize_var,
+            command=on_optimize_change,
+            width=30
+        )
+        optimize_check.pack(side="left", padx=10)
+        
+        # Precompiled header toggle; the label says that the headers are
+        # included in every program, since that can clash with its names
+        pch_var = tk.BooleanVar(value=self.state.get("precompiled_headers", False))
+        
+        def on_pch_change():
+            self.state["precompiled_headers"] = pch_var.get()
+        
+        pch_check = ctk.CTkCheckBox(
+            run_frame,
+            text="Auto-include stdio/stdlib/string/math (PCH)",
+            variable=pch_var,
+            command=on_pch_change,
+            width=30
+        )
+        pch_check.pack(side="left", padx=10)
+        
         # Settings on the right
         settings_frame = ctk.CTkFrame(toolbar, fg_color="transparent")
         settings_frame.pack(side="right", padx=5, pady=5)
@@ -275,16 +317,8 @@ class MainPanelView:
     
     def create_new_tab(self):
         """Create a new editor tab"""
-        starter_code = """#include <stdio.h>
-
-int main() {
-    // Your code here
-    printf("Hello, World!\\n");
-    return 0;
-}
-"""
         # Create a new tab with starter code
-        self.tab_view.create_tab(content=starter_code)
+        self.tab_view.create_tab(content=_STARTER_CODE)
     
     def open_file_dialog(self):
         """Open a file dialog and load selected file"""
@@ -357,7 +391,7 @@ int main() {
         editor = self.tab_view.get_current_editor()
         if editor:
             from chix.utils.formatter import format_c_code
-            code = editor.get("1.0", "end-1c")
+            code = get_code(editor)
             formatted_code = format_c_code(code)
             if formatted_code:
                 editor.delete("1.0", "end")
@@ -9,9 +9,14 @@ from chix.ui.widgets import EnhancedTextEditor, LineNumbers, TabButton, SearchRe
 from chix.ui.minimap import Minimap
 from chix.ui.theme import get_color
 from chix.utils.highlighter import highlight_syntax
-from chix.core.file_ops import save_file, save_file_as, save_to_temp, load_from_temp, clean_temp_files
+from chix.core.file_ops import save_file, save_file_as, save_to_temp, load_from_temp, clean_temp_files, write_file_atomic
+from chix.core.buffer_cache import get_code
 import uuid
 
+# Files are read and inserted this many characters at a time, yielding to
+# the event loop between pieces so large files do not freeze the window
+_LOAD_CHUNK_SIZE = 128 * 1024
+
 class TabView:
     """Tab view for managing multiple editor tabs"""
     
@@ -63,8 +68,8 @@ class TabView:
     def _autosave_all_tabs(self):
         """Autosave all open tabs to temp files"""
         for tab_id, tab_data in self.tabs.items():
-            if tab_data["modified"]:
-                content = tab_data["editor"].get("1.0", "end-1c")
+            if tab_data["modified"] and not tab_data.get("loading"):
+                content = get_code(tab_data["editor"])
                 temp_id = tab_data.get("temp_id")
                 if not temp_id:
                     temp_id = str(uuid.uuid4())
@@ -141,17 +146,8 @@ class TabView:
         if content:
             editor.delete("1.0", "end")
             editor.insert("1.0", content)
-            highlight_syntax(editor)
-        elif file_path and os.path.exists(file_path):
-            try:
-                with open(file_path, "r") as f:
-                    content = f.read()
-                    editor.delete("1.0", "end")
-                    editor.insert("1.0", content)
-                    highlight_syntax(editor)
-            except Exception as e:
-                # Insert error message
-                editor.insert("1.0", f"# Error loading file: {str(e)}\n\n")
+            # Highlight once the tab has been painted
+            editor.after_idle(lambda: highlight_syntax(editor))
         
         # Generate a unique ID for temp files
         temp_id = str(uuid.uuid4())
@@ -165,9 +161,14 @@ class TabView:
             "modified": False,
             "minimap": minimap,
             "search_bar": search_bar,
-            "temp_id": temp_id
+            "temp_id": temp_id,
+            "loading": False
         }
         
+        # Load the file once the tab is registered, so saves can see it loading
+        if not content and file_path and os.path.exists(file_path):
+            self._load_file(tab_id, file_path)
+        
         # If content was provided but no file path, save to temp immediately
         if content and not file_path:
             save_to_temp(content, temp_id)
@@ -284,6 +285,76 @@ class TabView:
             return self.tabs[self.current_tab_id]["file_path"]
         return None
     
+    def _load_file(self, tab_id, file_path):
+        """
+        Load a file into a tab's editor
+        
+        Small files are inserted at once. Larger ones are inserted in
+        chunks from after() callbacks, and highlighted once fully loaded;
+        until then the editor is read-only and the tab is not saved.
+        
+        Args:
+            tab_id (str): Tab whose editor is filled
+            file_path (str): Path of the file to load
+        """
+        tab_data = self.tabs[tab_id]
+        editor = tab_data["editor"]
+        text_widget = editor._textbox
+        
+        try:
+            f = open(file_path, "r", buffering=_LOAD_CHUNK_SIZE)
+            chunk = f.read(_LOAD_CHUNK_SIZE)
+        except Exception as e:
+            # Insert error message
+            editor.insert("1.0", f"# Error loading file: {str(e)}\n\n")
+            return
+        
+        editor.delete("1.0", "end")
+        
+        def finish_loading():
+            f.close()
+            tab_data["loading"] = False
+            text_widget.configure(state="normal")
+        
+        def load_chunk(chunk):
+            # Stop if the tab was closed while loading
+            if not editor.winfo_exists():
+                f.close()
+                return
+            
+            # The editor only accepts text while a chunk is appended
+            text_widget.configure(state="normal")
+            try:
+                editor.insert("end", chunk)
+                next_chunk = f.read(_LOAD_CHUNK_SIZE)
+            except Exception as e:
+                # Detach the tab from the file, so saving the partial text
+                # goes through Save As instead of replacing it
+                finish_loading()
+                tab_data["file_path"] = None
+                editor.insert("end", f"\n# Error loading file: {str(e)}\n")
+                return
+            
+            if next_chunk:
+                text_widget.configure(state="disabled")
+                editor.after(1, load_chunk, next_chunk)
+                return
+            
+            finish_loading()
+            
+            # Undo should not take back part of the loaded file
+            text_widget.edit_reset()
+            highlight_syntax(editor)
+        
+        if len(chunk) < _LOAD_CHUNK_SIZE:
+            # Whole file read; highlight once the tab has been painted
+            f.close()
+            editor.insert("1.0", chunk)
+            editor.after_idle(lambda: highlight_syntax(editor))
+        else:
+            tab_data["loading"] = True
+            load_chunk(chunk)
+    
     def open_file(self, file_path):
         """Open a file in a new tab or existing tab if already open"""
         # Check if file is already open
@@ -301,13 +372,16 @@ class TabView:
             return False
         
         tab_data = self.tabs[tab_id]
-        content = tab_data["editor"].get("1.0", "end-1c")
+        if self._refuse_while_loading(tab_data):
+            return False
+        
+        content = get_code(tab_data["editor"])
         
         if tab_data["file_path"]:
             # Save to existing file
             try:
-                with open(tab_data["file_path"], "w") as f:
-                    f.write(content)
+                # Same locale encoding the file is loaded with
+                write_file_atomic(tab_data["file_path"], content, encoding=None)
                 
                 # Mark as not modified
                 self.mark_tab_modified(tab_id, modified=False)
@@ -331,7 +405,8 @@ class TabView:
             return False
         
         tab_data = self.tabs[tab_id]
-        content = tab_data["editor"].get("1.0", "end-1c")
+        if self._refuse_while_loading(tab_data):
+            return False
         
         # Get current file path if any
         current_file_path = tab_data["file_path"]
@@ -366,6 +441,23 @@ class TabView:
         
         return False
     
+    def _refuse_while_loading(self, tab_data):
+        """
+        Check whether a tab is still loading its file, and say so if it is
+        
+        Args:
+            tab_data (dict): Tab to check
+        
+        Returns:
+            bool: True if the tab must not be saved yet
+        """
+        if not tab_data.get("loading"):
+            return False
+        
+        if "status_bar" in self.state:
+            self.state["status_bar"].set_message("File is still loading, try saving again shortly")
+        return True
+    
     def save_current_tab(self):
         """Save the current tab"""
         if self.current_tab_id:
@@ -397,10 +489,11 @@ class TabView:
         if tab_id in self.tab_buttons:
             self.tab_buttons[tab_id].mark_modified(modified)
         
-        # If file is modified, save to temp immediately
-        if modified:
-            tab_data = self.tabs[tab_id]
-            content = tab_data["editor"].get("1.0", "end-1c")
+        # If file is modified, save to temp immediately, unless only part of
+        # it has been loaded yet
+        tab_data = self.tabs[tab_id]
+        if modified and not tab_data.get("loading"):
+            content = get_code(tab_data["editor"])
             temp_id = tab_data.get("temp_id")
             if not temp_id:
                 temp_id = str(uuid.uuid4())
@@ -5,6 +5,7 @@ Theme management for ChiX Editor
 import customtkinter as ctk
 import json
 import os
+from types import MappingProxyType
 
 # Define color schemes
 THEMES = {
@@ -90,33 +91,42 @@ THEMES = {
     }
 }
 
+# Color schemes are read-only so the active one can be shared safely
+THEMES = {name: MappingProxyType(colors) for name, colors in THEMES.items()}
+
 # Current theme - can be changed at runtime
 current_theme = "vscode_dark"
 
+# Colors of the current theme, kept in sync with current_theme
+_ACTIVE = THEMES[current_theme]
+
+def _activate(theme_name):
+    """Make a theme current and refresh the active color lookup"""
+    global current_theme, _ACTIVE
+    current_theme = theme_name
+    _ACTIVE = THEMES[theme_name]
+
 def get_theme():
     """Get the current theme colors"""
-    return THEMES[current_theme]
+    return _ACTIVE
 
 def get_color(color_key):
     """Get a specific color from the current theme"""
-    theme = get_theme()
-    return theme.get(color_key, "#ffffff")
+    return _ACTIVE.get(color_key, "#ffffff")
 
 def set_theme(theme_name):
     """Set the active theme"""
-    global current_theme
     if theme_name in THEMES:
-        current_theme = theme_name
+        _activate(theme_name)
         return True
     return False
 
 def cycle_theme():
     """Cycle through available themes"""
-    global current_theme
     theme_keys = list(THEMES.keys())
     current_index = theme_keys.index(current_theme)
     next_index = (current_index + 1) % len(theme_keys)
-    current_theme = theme_keys[next_index]
+    _activate(theme_keys[next_index])
     return current_theme
 
 def setup_theme():
@@ -158,20 +168,18 @@ def save_theme_preferences(file_path="theme_prefs.json"):
     }
     
     try:
-        with open(file_path, 'w') as f:
-            json.dump(prefs, f)
+        with open(file_path, 'wb') as f:
+            f.write(json.dumps(prefs, ensure_ascii=False).encode("utf-8"))
     except Exception as e:
         print(f"Error saving theme preferences: {e}")
 
 def load_theme_preferences(file_path="theme_prefs.json"):
     """Load theme preferences from a file"""
-    global current_theme
-    
     try:
         if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                prefs = json.load(f)
+            with open(file_path, 'rb') as f:
+                prefs = json.loads(f.read())
                 if "theme" in prefs and prefs["theme"] in THEMES:
-                    current_theme = prefs["theme"]
+                    _activate(prefs["theme"])
     except Exception as e:
         print(f"Error loading theme preferences: {e}")
@@ -5,9 +5,19 @@ Custom widgets for ChiX Editor
 import customtkinter as ctk
 import tkinter as tk
 from chix.ui.theme import get_theme, get_color
-from chix.utils.highlighter import highlight_syntax
+from chix.utils.highlighter import highlight_syntax_debounced, highlight_if_scrolled_out
+from chix.core.compiler import Compiler
+from chix.core.buffer_cache import get_code
 import webbrowser
 import re
+import threading
+import os
+
+# Leading whitespace of a line, copied when auto-indenting
+_INDENT_RE = re.compile(r"^(\s+)")
+
+# Quiet period after the last edit before the compiler checks the code
+_SYNTAX_CHECK_DELAY_MS = 800
 
 class LineNumbers(ctk.CTkCanvas):
     """Line numbers widget for editor"""
@@ -27,10 +37,10 @@ class LineNumbers(ctk.CTkCanvas):
         
         # Bind events if text_widget is provided
         if self.text_widget is not None:
-            self.text_widget.bind('<KeyRelease>', self.redraw)
-            self.text_widget.bind('<ButtonRelease-1>', self.redraw)
-            self.text_widget.bind('<MouseWheel>', self.redraw)
-            self.text_widget.bind('<Configure>', self.redraw)
+            self.text_widget.bind('<KeyRelease>', self.redraw, add="+")
+            self.text_widget.bind('<ButtonRelease-1>', self.redraw, add="+")
+            self.text_widget.bind('<MouseWheel>', self.redraw, add="+")
+            self.text_widget.bind('<Configure>', self.redraw, add="+")
             
             # Draw initial line numbers
             self.redraw()
@@ -46,8 +56,10 @@ class LineNumbers(ctk.CTkCanvas):
                                   fill=get_color("bg_secondary"), outline="")
             return
         
-        # Get total lines
-        line_count = int(self.text_widget.index('end-1c').split('.')[0])
+        # Ask Tk for the first and last visible lines once rather than probing
+        # every line in the buffer; lines outside this range have no dlineinfo
+        first_line = int(self.text_widget.index("@0,0").split('.')[0])
+        last_line = int(self.text_widget.index(f"@0,{self.text_widget.winfo_height()}").split('.')[0])
         
         # Create background
         self.create_rectangle(0, 0, self.winfo_width(), self.winfo_height(), 
@@ -56,7 +68,7 @@ class LineNumbers(ctk.CTkCanvas):
         # Current line highlight
         current_line = int(self.text_widget.index(tk.INSERT).split('.')[0])
         
-        for i in range(1, line_count + 1):
+        for i in range(first_line, last_line + 1):
             y_coord = self.text_widget.dlineinfo(f"{i}.0")
             if y_coord:
                 # Highlight current line
@@ -103,6 +115,13 @@ class EnhancedTextEditor(ctk.CTkTextbox):
         # Track syntax errors
         self.error_lines = set()
         
+        # Errors from the background compiler syntax check, by line
+        self.compiler_errors = {}
+        self._shown_compiler_error = None
+        self._syntax_check_job = None
+        self._syntax_check_generation = 0
+        self._checked_code = None
+        
         # Last position for context menu
         self.last_click_pos = "1.0"
     
@@ -132,6 +151,15 @@ class EnhancedTextEditor(ctk.CTkTextbox):
         
         # Track changes
         self.bind('<KeyRelease>', self._on_text_changed)
+        
+        # Highlighting covers the lines around the view, so catch up when
+        # scrolling or resizing brings other lines into sight
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>', '<Configure>'):
+            self.bind(sequence, self._on_view_changed)
+        scrollbar = getattr(self, "_y_scrollbar", None)
+        if scrollbar is not None:
+            scrollbar.bind('<B1-Motion>', self._on_view_changed)
+            scrollbar.bind('<ButtonRelease-1>', self._on_view_changed)
     
     def _setup_tags(self):
         """Set up text tags for syntax highlighting"""
@@ -147,6 +175,7 @@ class EnhancedTextEditor(ctk.CTkTextbox):
         text_widget.tag_configure("number", foreground=get_color("number"))
         text_widget.tag_configure("operator", foreground=get_color("operator"))
         text_widget.tag_configure("error", foreground=get_color("error"), underline=1)
+        text_widget.tag_configure("compiler_error", underline=1)
         
         # Selection and cursor line highlighting
         text_widget.tag_configure("current_line", background=get_color("line_highlight"))
@@ -169,7 +198,7 @@ class EnhancedTextEditor(ctk.CTkTextbox):
         line = self.get("insert linestart", "insert lineend")
         
         # Calculate the indentation level (count leading spaces)
-        indent_match = re.match(r"^(\s+)", line)
+        indent_match = _INDENT_RE.match(line)
         indent = indent_match.group(1) if indent_match else ""
         
         # Check if we need to add additional indentation
@@ -238,16 +267,101 @@ class EnhancedTextEditor(ctk.CTkTextbox):
     
     def _on_text_changed(self, event=None):
         """Handle text changes for syntax highlighting"""
-        # Call the highlighting function
-        highlight_syntax(self)
+        # Highlight once typing pauses rather than on every keystroke
+        highlight_syntax_debounced(self)
         
         # Highlight the current line
         self._highlight_current_line()
         
+        # Show the compiler error of the line the cursor moved to, if any
+        self._show_compiler_error()
+        
+        # Have the compiler check the code once typing pauses
+        if self.state.get("live_diagnostics", True):
+            self._schedule_syntax_check()
+        
         # Update the document in the app state
         if hasattr(self, "on_text_changed") and callable(self.on_text_changed):
             self.on_text_changed()
     
+    def _schedule_syntax_check(self):
+        """Run the compiler syntax check after the typing pause"""
+        if self._syntax_check_job is not None:
+            self.after_cancel(self._syntax_check_job)
+        self._syntax_check_job = self.after(_SYNTAX_CHECK_DELAY_MS, self._start_syntax_check)
+    
+    def _start_syntax_check(self):
+        """Check the current code with the compiler on a worker thread"""
+        self._syntax_check_job = None
+        
+        # Keys that did not edit the code need no new check
+        code = get_code(self)
+        if code == self._checked_code:
+            return
+        self._checked_code = code
+        
+        self._syntax_check_generation += 1
+        generation = self._syntax_check_generation
+        
+        # Quoted includes are looked up next to the file being edited
+        source_dir = None
+        file_path = self.state.get("current_file")
+        if file_path and self.state.get("active_editor") is self:
+            source_dir = os.path.dirname(os.path.abspath(file_path))
+        
+        def check():
+            errors = Compiler().check_syntax(code, source_dir)
+            self.after(0, self._apply_syntax_check, generation, errors)
+        
+        threading.Thread(target=check, daemon=True).start()
+    
+    def _apply_syntax_check(self, generation, errors):
+        """
+        Underline the lines the compiler reported errors on
+        
+        Args:
+            generation (int): Check the errors belong to
+            errors: (line, message) pairs from Compiler.check_syntax
+        """
+        # Results of an older check are superseded
+        if generation != self._syntax_check_generation or not self.winfo_exists():
+            return
+        
+        text_widget = self._textbox
+        text_widget.tag_remove("compiler_error", "1.0", tk.END)
+        
+        # Keep the first message for each line and tag all lines in one call
+        self.compiler_errors = {}
+        ranges = []
+        for line, message in errors:
+            if line not in self.compiler_errors:
+                self.compiler_errors[line] = message
+                ranges.extend((f"{line}.0", f"{line}.end"))
+        
+        if ranges:
+            text_widget.tag_add("compiler_error", *ranges)
+        
+        self._shown_compiler_error = None
+        self._show_compiler_error()
+    
+    def _show_compiler_error(self):
+        """Show the compiler error for the cursor line in the status bar"""
+        status_bar = self.state.get("status_bar")
+        if status_bar is None:
+            return
+        
+        line = int(self._textbox.index(tk.INSERT).split('.')[0])
+        message = self.compiler_errors.get(line)
+        
+        # Only announce an error once while the cursor stays on its line
+        if message and message != self._shown_compiler_error:
+            status_bar.set_message(f"Line {line}: {message}")
+        self._shown_compiler_error = message
+    
+    def _on_view_changed(self, event=None):
+        """Highlight newly visible lines after the view moves"""
+        highlight_if_scrolled_out(self)
+    
     def _highlight_current_line(self):
         """Highlight the line where the cursor is located"""
         text_widget = self._textbox
@@ -350,6 +464,28 @@ class EnhancedTextEditor(ctk.CTkTextbox):
             self.error_messages = {}
         self.error_messages[line] = message
     
+    def mark_errors(self, errors):
+        """
+        Mark several lines as containing errors
+        
+        All lines are tagged with a single tag_add call.
+        
+        Args:
+            errors: (line, message) pairs; a later message for the same line wins
+        """
+        if not hasattr(self, "error_messages"):
+            self.error_messages = {}
+        
+        ranges = []
+        for line, message in errors:
+            line = int(line)
+            self.error_lines.add(line)
+            self.error_messages[line] = message
+            ranges.extend((f"{line}.0", f"{line}.end"))
+        
+        if ranges:
+            self._textbox.tag_add("error", *ranges)
+    
     def clear_errors(self):
         """Clear all error markings"""
         text_widget = self._textbox
@@ -686,10 +822,11 @@ class SearchReplaceBar(ctk.CTkFrame):
             return
         
         # Get editor content
-        content = self.editor.get("1.0", "end-1c")
+        content = get_code(self.editor)
         
         # Find all matches
         self.matches = []
+        to_position = self._position_converter(content)
         case_sensitive = self.case_sensitive_var.get()
         use_regex = self.regex_var.get()
         
@@ -701,8 +838,8 @@ class SearchReplaceBar(ctk.CTkFrame):
                     pattern = re.compile(search_text, re.IGNORECASE)
                 
                 for match in pattern.finditer(content):
-                    start_pos = self._get_text_position(content, match.start())
-                    end_pos = self._get_text_position(content, match.end())
+                    start_pos = to_position(match.start())
+                    end_pos = to_position(match.end())
                     self.matches.append((start_pos, end_pos))
             except re.error:
                 # Invalid regex, don't search
@@ -722,8 +859,8 @@ class SearchReplaceBar(ctk.CTkFrame):
                     break
                     
                 end = start + len(search_text)
-                start_pos = self._get_text_position(content, start)
-                end_pos = self._get_text_position(content, end)
+                start_pos = to_position(start)
+                end_pos = to_position(end)
                 self.matches.append((start_pos, end_pos))
                 start = end
         
@@ -739,12 +876,34 @@ class SearchReplaceBar(ctk.CTkFrame):
             else:
                 self.editor.state["status_bar"].set_message("No matches found")
     
-    def _get_text_position(self, text, index):
-        """Convert character index to 'line.column' position"""
-        lines = text[:index].split("\n")
-        line = len(lines)
-        col = len(lines[-1])
-        return f"{line}.{col}"
+    def _position_converter(self, text):
+        """
+        Create a function converting character indexes in text to 'line.column'
+        
+        Matches are found in ascending order, so each conversion only scans the
+        text between the previous index and the new one instead of the whole
+        prefix.
+        """
+        offset = 0
+        line = 1
+        line_start = 0
+        
+        def to_position(index):
+            nonlocal offset, line, line_start
+            
+            # Start over if asked to go backwards
+            if index < offset:
+                offset, line, line_start = 0, 1, 0
+            
+            newlines = text.count("\n", offset, index)
+            if newlines:
+                line += newlines
+                line_start = text.rfind("\n", offset, index) + 1
+            offset = index
+            
+            return f"{line}.{index - line_start}"
+        
+        return to_position
     
     def _highlight_all_matches(self):
         """Highlight all found matches"""
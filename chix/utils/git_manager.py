@@ -4,10 +4,51 @@ Handles git operations like status, commit, push, etc.
 """
 
 import os
+import asyncio
 import subprocess
-import re
+import threading
+import time
 from pathlib import Path
 
+# pygit2 answers status and branch queries in-process when installed;
+# without it every query runs the git executable
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Seconds a status map is reused before git is asked again
+_STATUS_CACHE_TTL = 0.5
+
+# libgit2 status flags and the porcelain status letters they correspond to
+_INDEX_STATUS_FLAGS = ((1, 'A'), (2, 'M'), (4, 'D'), (8, 'R'), (16, 'T'))
+_WORKTREE_STATUS_FLAGS = ((256, 'M'), (512, 'D'), (1024, 'T'), (2048, 'R'))
+_WORKTREE_NEW_FLAG = 128
+_IGNORED_FLAG = 16384
+_CONFLICTED_FLAG = 32768
+
+def _status_code_from_flags(flags):
+    """
+    Convert libgit2 status flags to a two-character porcelain status code
+    
+    Args:
+        flags (int): Status flags reported by pygit2
+        
+    Returns:
+        str: Porcelain status code, or None for ignored files
+    """
+    if flags & _IGNORED_FLAG:
+        return None
+    if flags & _CONFLICTED_FLAG:
+        return 'UU'
+    
+    index_code = next((code for flag, code in _INDEX_STATUS_FLAGS if flags & flag), ' ')
+    if flags & _WORKTREE_NEW_FLAG and index_code == ' ':
+        return '??'
+    
+    worktree_code = next((code for flag, code in _WORKTREE_STATUS_FLAGS if flags & flag), ' ')
+    return index_code + worktree_code
+
 class GitManager:
     """Handles Git operations for a repository"""
     
@@ -21,6 +62,16 @@ class GitManager:
         self.repo_path = repo_path
         if not self.repo_path:
             self.repo_path = self._detect_repo_path()
+        
+        # (repo_path, pygit2.Repository) opened on first use; queries run on
+        # background threads, so access to the repository is serialized
+        self._repository = None
+        self._repository_lock = threading.Lock()
+        
+        # (time.monotonic() of the query, result) of the last status and
+        # branch queries
+        self._status_cache = None
+        self._branch_cache = None
     
     def _detect_repo_path(self, start_path=None):
         """
@@ -64,6 +115,26 @@ class GitManager:
         git_dir = os.path.join(self.repo_path, '.git')
         return os.path.exists(git_dir) and os.path.isdir(git_dir)
     
+    def _get_repository(self):
+        """
+        Get the pygit2 repository for repo_path
+        
+        Returns:
+            pygit2.Repository: Repository, or None if pygit2 is not installed
+                or cannot open it
+        """
+        if pygit2 is None or not self.is_git_repo():
+            return None
+        
+        if self._repository is None or self._repository[0] != self.repo_path:
+            try:
+                repository = pygit2.Repository(self.repo_path)
+            except Exception:
+                repository = None
+            self._repository = (self.repo_path, repository)
+        
+        return self._repository[1]
+    
     def _run_git_command(self, command, cwd=None):
         """
         Run a git command and return the result
@@ -92,6 +163,32 @@ class GitManager:
         except (subprocess.SubprocessError, FileNotFoundError) as e:
             return 1, str(e)
     
+    async def _run_git_command_async(self, command, cwd=None):
+        """
+        Run a git command without blocking the event loop
+        
+        Args:
+            command (list): Git command parts
+            cwd (str, optional): Working directory
+            
+        Returns:
+            (int, str): (return code, output) tuple
+        """
+        if not cwd:
+            cwd = self.repo_path
+            
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'git', *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=cwd
+            )
+            output, _ = await process.communicate()
+            return process.returncode, output.decode(errors='replace')
+        except (subprocess.SubprocessError, OSError) as e:
+            return 1, str(e)
+    
     def get_status(self):
         """
         Get git status information
@@ -188,20 +285,156 @@ class GitManager:
                 # File is outside the repository
                 return None
             file_path = rel_path
+        
+        # Look the file up in the shared, briefly cached status map
+        return self.get_status_map().get(os.path.normpath(file_path))
+    
+    def get_status_map(self):
+        """
+        Get the status of every changed file with a single git call
+        
+        Bursts of queries share one result: a map younger than
+        _STATUS_CACHE_TTL seconds is returned again unless invalidate() was
+        called since. The returned dict must not be modified.
+        
+        Returns:
+            dict: Mapping of file path (relative to the repository) to status string
+                ('modified', 'untracked', 'staged', 'deleted' or 'renamed')
+        """
+        if not self.is_git_repo():
+            return {}
+        
+        cache = self._status_cache
+        now = time.monotonic()
+        if cache is not None and now - cache[0] < _STATUS_CACHE_TTL:
+            return cache[1]
+        
+        status_map = self._read_status_map()
+        self._status_cache = (now, status_map)
+        return status_map
+    
+    def invalidate(self):
+        """Forget the cached status map and branch, e.g. after files were saved"""
+        self._status_cache = None
+        self._branch_cache = None
+    
+    async def refresh_all(self):
+        """
+        Query the current branch and the status map concurrently
+        
+        Both git processes run at the same time, so a refresh waits for one
+        process start-up instead of two. The results are cached as if
+        get_current_branch and get_status_map had been called.
+        
+        Returns:
+            (str, dict): (branch name or None, status map)
+        """
+        if not self.is_git_repo():
+            return None, {}
+        
+        now = time.monotonic()
+        if self._get_repository() is not None:
+            # libgit2 answers in-process; there are no processes to overlap
+            branch = self._read_current_branch()
+            status_map = self._read_status_map()
+        else:
+            (branch_code, branch_output), (status_code, status_output) = await asyncio.gather(
+                self._run_git_command_async(['rev-parse', '--abbrev-ref', 'HEAD']),
+                self._run_git_command_async(['status', '--porcelain=v1', '-z'])
+            )
+            branch = branch_output.strip() if branch_code == 0 else None
+            status_map = self._parse_status_output(status_output) if status_code == 0 else {}
+        
+        self._branch_cache = (now, branch)
+        self._status_cache = (now, status_map)
+        return branch, status_map
+    
+    def _read_status_map(self):
+        """
+        Query git for the status of every changed file
+        
+        Returns:
+            dict: Mapping of file path (relative to the repository) to status string
+        """
+        repository = self._get_repository()
+        if repository is not None:
+            try:
+                with self._repository_lock:
+                    statuses = repository.status(untracked_files="normal")
+                
+                status_map = {}
+                for file_path, flags in statuses.items():
+                    status_code = _status_code_from_flags(flags)
+                    status = self._classify_status(status_code) if status_code else None
+                    if status:
+                        status_map[os.path.normpath(file_path)] = status
+                return status_map
+            except Exception:
+                pass
+            
+        code, output = self._run_git_command(['status', '--porcelain=v1', '-z'])
+        if code != 0:
+            return {}
+        
+        return self._parse_status_output(output)
+    
+    def _parse_status_output(self, output):
+        """
+        Parse the output of 'git status --porcelain=v1 -z'
+        
+        Args:
+            output (str): Command output
             
-        # Get status info
-        status = self.get_status()
+        Returns:
+            dict: Mapping of file path (relative to the repository) to status string
+        """
+        status_map = {}
+        entries = output.split('\0')
+        index = 0
         
-        if file_path in status.get("modified", []):
+        while index < len(entries):
+            entry = entries[index]
+            index += 1
+            
+            if len(entry) < 4:
+                continue
+                
+            status_code = entry[:2]
+            file_path = entry[3:]
+            
+            # Renamed and copied entries are followed by their original path
+            if 'R' in status_code or 'C' in status_code:
+                index += 1
+            
+            status = self._classify_status(status_code)
+            if status:
+                status_map[os.path.normpath(file_path)] = status
+        
+        return status_map
+    
+    def _classify_status(self, status_code):
+        """
+        Reduce a porcelain status code to the status reported by get_file_status
+        
+        Args:
+            status_code (str): Two-character porcelain status code
+            
+        Returns:
+            str: Status string or None
+        """
+        if status_code[0] == 'R' or status_code[1] == 'R':
+            return "renamed"
+            
+        deleted = status_code[0] == 'D' or status_code[1] == 'D'
+        
+        if not deleted and status_code[1] == 'M':
             return "modified"
-        elif file_path in status.get("untracked", []):
+        elif status_code[0] == '?':
             return "untracked"
-        elif file_path in status.get("staged", []):
+        elif status_code[0] != ' ':
             return "staged"
-        elif file_path in status.get("deleted", []):
+        elif deleted:
             return "deleted"
-        elif file_path in status.get("renamed", []):
-            return "renamed"
             
         return None
     
@@ -219,6 +452,7 @@ class GitManager:
             return False, "Not a git repository"
             
         code, output = self._run_git_command(['commit', '-m', message])
+        self.invalidate()
         return code == 0, output
     
     def stage_file(self, file_path):
@@ -235,6 +469,7 @@ class GitManager:
             return False, "Not a git repository"
             
         code, output = self._run_git_command(['add', file_path])
+        self.invalidate()
         return code == 0, output
     
     def unstage_file(self, file_path):
@@ -251,6 +486,7 @@ class GitManager:
             return False, "Not a git repository"
             
         code, output = self._run_git_command(['reset', 'HEAD', file_path])
+        self.invalidate()
         return code == 0, output
     
     def get_current_branch(self):
@@ -262,6 +498,31 @@ class GitManager:
         """
         if not self.is_git_repo():
             return None
+        
+        # Reuse a branch name read moments ago, e.g. by refresh_all
+        cache = self._branch_cache
+        now = time.monotonic()
+        if cache is not None and now - cache[0] < _STATUS_CACHE_TTL:
+            return cache[1]
+        
+        branch = self._read_current_branch()
+        self._branch_cache = (now, branch)
+        return branch
+    
+    def _read_current_branch(self):
+        """
+        Query git for the current branch name
+        
+        Returns:
+            str: Current branch name or None
+        """
+        repository = self._get_repository()
+        if repository is not None:
+            try:
+                with self._repository_lock:
+                    return repository.head.shorthand
+            except Exception:
+                pass
             
         code, output = self._run_git_command(['rev-parse', '--abbrev-ref', 'HEAD'])
         if code == 0:
@@ -305,6 +566,7 @@ class GitManager:
             return False, "Not a git repository"
             
         code, output = self._run_git_command(['checkout', branch_name])
+        self.invalidate()
         return code == 0, output
     
     def create_branch(self, branch_name):
@@ -321,6 +583,7 @@ class GitManager:
             return False, "Not a git repository"
             
         code, output = self._run_git_command(['checkout', '-b', branch_name])
+        self.invalidate()
         return code == 0, output
     
     def get_commit_history(self, max_count=10):
@@ -5,15 +5,55 @@ Syntax highlighter for C code using Pygments
 import customtkinter as ctk
 import tkinter as tk
 import re
+import threading
 import pygments
 from pygments.lexers import CLexer
 from pygments.token import Token
-from chix.ui.theme import get_color
+from chix.ui.theme import get_color, get_theme
+from chix.core.buffer_cache import get_code
+
+# Tags set from the token stream, with the theme color each one uses
+_TOKEN_TAG_COLORS = (
+    ("keyword", "keyword"),
+    ("string", "string"),
+    ("comment", "comment"),
+    ("function", "function"),
+    ("preprocessor", "type"),
+    ("type", "type"),
+    ("number", "number"),
+    ("operator", "operator"),
+    ("variable", "variable"),
+    ("parameter", "parameter"),
+)
+
+# Line patterns used by check_syntax_errors
+_UNCLOSED_STRING_RE = re.compile(r'\"[^\"]*$')
+_INITIALIZED_DECL_RE = re.compile(r'^\s*(int|char|float|double|void)\s+\w+\s*=.+')
+_BLOCK_HEADER_RE = re.compile(r'^\s*\w+\s*\(.*\)\s*{')
+
+# Lines that can fail one of those checks: each needs a quote, an '=' or a brace
+_ERROR_CANDIDATE_RE = re.compile(r'^[^\n]*["={}][^\n]*', re.MULTILINE)
+
+# Shared lexer, so Pygments builds its token tables once; leading newlines
+# are kept so token positions line up with the buffer
+_LEXER = CLexer(stripnl=False)
+
+# Quiet period after the last edit before the buffer is highlighted again
+_HIGHLIGHT_DELAY_MS = 150
+
+# Lines lexed above and below the visible ones, so scrolling a little shows
+# highlighted text and most comments and strings open inside the region
+_HIGHLIGHT_MARGIN_LINES = 200
 
 def highlight_syntax(editor):
     """
     Highlight syntax in the given editor widget using Pygments
     
+    Tokens are highlighted for the visible lines and a margin around them.
+    Lexing runs on a worker thread and the tags are applied back on the Tk
+    thread; bracket matching and error checks run at once over the whole
+    buffer.
+    
     Args:
         editor: The EnhancedTextEditor widget
     """
@@ -21,169 +61,316 @@ def highlight_syntax(editor):
     text_widget = editor._textbox
     
     # Get current content
-    content = editor.get("1.0", "end-1c")
-    
-    # Save current cursor position
-    current_pos = editor.index(tk.INSERT)
-    
-    # Clear existing highlighting tags
-    for tag in text_widget.tag_names():
-        if tag not in ["sel", "current_line", "matching_bracket"]:
-            text_widget.tag_remove(tag, "1.0", "end")
-    
-    # Configure tags with theme colors
-    text_widget.tag_configure("keyword", foreground=get_color("keyword"))
-    text_widget.tag_configure("string", foreground=get_color("string"))
-    text_widget.tag_configure("comment", foreground=get_color("comment"))
-    text_widget.tag_configure("function", foreground=get_color("function"))
-    text_widget.tag_configure("preprocessor", foreground=get_color("type"))
-    text_widget.tag_configure("type", foreground=get_color("type"))
-    text_widget.tag_configure("number", foreground=get_color("number"))
-    text_widget.tag_configure("operator", foreground=get_color("operator"))
-    text_widget.tag_configure("variable", foreground=get_color("variable"))
-    text_widget.tag_configure("parameter", foreground=get_color("parameter"))
+    content = get_code(editor)
+    
+    # Only the visible lines and a margin around them are lexed
+    start_line, end_line = _visible_lines(text_widget)
+    start_line = max(1, start_line - _HIGHLIGHT_MARGIN_LINES)
+    end_line += _HIGHLIGHT_MARGIN_LINES
+    start_line = _block_comment_start(text_widget, content, start_line)
+    region = editor.get(f"{start_line}.0", f"{end_line}.0 lineend")
+    editor._highlighted_lines = (start_line, end_line)
+    
+    # Results of lexing started before this call are out of date
+    generation = _next_highlight_generation(editor)
+    
+    def lex():
+        try:
+            ranges = _token_ranges(region, start_line)
+        except Exception as e:
+            print(f"Highlighting error: {e}")
+            return
+        editor.after(0, _apply_token_ranges, editor, generation, start_line, end_line, ranges)
+    
+    threading.Thread(target=lex, daemon=True).start()
     
     try:
-        # Apply syntax highlighting
-        lexer = CLexer()
-        tokens = lexer.get_tokens(content)
-        
-        pos = 0
-        for token, text in tokens:
-            start_index = "1.0 + %d chars" % pos
-            end_index = "1.0 + %d chars" % (pos + len(text))
-            
-            if token in Token.Keyword:
-                text_widget.tag_add("keyword", start_index, end_index)
-            elif token in Token.String:
-                text_widget.tag_add("string", start_index, end_index)
-            elif token in Token.Comment:
-                text_widget.tag_add("comment", start_index, end_index)
-            elif token in Token.Name.Function:
-                text_widget.tag_add("function", start_index, end_index)
-            elif token in Token.Name.Builtin:
-                text_widget.tag_add("type", start_index, end_index)
-            elif token in Token.Literal.Number:
-                text_widget.tag_add("number", start_index, end_index)
-            elif token in Token.Operator:
-                text_widget.tag_add("operator", start_index, end_index)
-            elif token in Token.Name:
-                # Check for specific names like variables vs parameters
-                if pos > 0 and content[pos-1] == "(":
-                    text_widget.tag_add("parameter", start_index, end_index)
-                else:
-                    text_widget.tag_add("variable", start_index, end_index)
-            
-            # Special case for preprocessor directives
-            if text.startswith("#"):
-                text_widget.tag_add("preprocessor", start_index, end_index)
-                
-            pos += len(text)
-        
         # Highlight matching brackets
-        highlight_matching_brackets(editor)
+        highlight_matching_brackets(editor, content)
         
         # Check for syntax errors
-        check_syntax_errors(editor)
+        check_syntax_errors(editor, content)
         
     except Exception as e:
         print(f"Highlighting error: {e}")
+
+def _block_comment_start(text_widget, content, line):
+    """
+    Move a lexing start line back to the opening of a block comment it is in
+    
+    The lexer starts without state, so a region starting inside a long
+    /* ... */ comment would lex the rest of the comment as code.
+    
+    Args:
+        text_widget: The Tkinter Text widget
+        content (str): Editor text
+        line (int): Line lexing would start on
+    
+    Returns:
+        int: Line lexing should start on
+    """
+    if line <= 1:
+        return line
     
-    # Restore cursor position
-    editor.mark_set(tk.INSERT, current_pos)
-    editor.see(current_pos)
+    # Comments do not nest, so only the last opening before the line
+    # matters: the line is inside it if it has not been closed yet
+    offset = (text_widget.count("1.0", f"{line}.0", "chars") or (0,))[0]
+    opening = content.rfind("/*", 0, offset)
+    if opening == -1 or content.find("*/", opening + 2, offset) != -1:
+        return line
+    
+    return content.count("\n", 0, opening) + 1
+
+def _next_highlight_generation(editor):
+    """Invalidate lexing results in flight for an editor"""
+    editor._highlight_generation = getattr(editor, "_highlight_generation", 0) + 1
+    return editor._highlight_generation
 
-def highlight_matching_brackets(editor):
+def _token_ranges(region, start_line):
+    """
+    Lex a region of C code and collect the tag ranges of its tokens
+    
+    Touches no Tk state, so it can run on a worker thread.
+    
+    Args:
+        region (str): Code to lex
+        start_line (int): Buffer line the region starts on
+    
+    Returns:
+        dict: Tag name to a flat list of alternating start and end indices
+    """
+    tokens = _LEXER.get_tokens(region)
+    
+    # Track the line and column of each token while walking the stream,
+    # and collect its range under its tag; each tag is then applied with
+    # a single tag_add call instead of one per token
+    ranges = {}
+    pos = 0
+    line = start_line
+    col = 0
+    for token, text in tokens:
+        start_index = f"{line}.{col}"
+        newlines = text.count("\n")
+        if newlines:
+            line += newlines
+            col = len(text) - text.rfind("\n") - 1
+        else:
+            col += len(text)
+        end_index = f"{line}.{col}"
+        
+        if token in Token.Keyword:
+            tag = "keyword"
+        elif token in Token.String:
+            tag = "string"
+        elif token in Token.Comment:
+            tag = "comment"
+        elif token in Token.Name.Function:
+            tag = "function"
+        elif token in Token.Name.Builtin:
+            tag = "type"
+        elif token in Token.Literal.Number:
+            tag = "number"
+        elif token in Token.Operator:
+            tag = "operator"
+        elif token in Token.Name:
+            # Check for specific names like variables vs parameters
+            if pos > 0 and region[pos-1] == "(":
+                tag = "parameter"
+            else:
+                tag = "variable"
+        else:
+            tag = None
+        
+        if tag is not None:
+            ranges.setdefault(tag, []).extend((start_index, end_index))
+        
+        # Special case for preprocessor directives
+        if text.startswith("#"):
+            ranges.setdefault("preprocessor", []).extend((start_index, end_index))
+            
+        pos += len(text)
+    
+    return ranges
+
+def _apply_token_ranges(editor, generation, start_line, end_line, ranges):
+    """
+    Replace the token tags of a region with freshly lexed ones
+    
+    Args:
+        editor: The EnhancedTextEditor widget
+        generation (int): Highlight request the ranges were lexed for
+        start_line (int): First line of the lexed region
+        end_line (int): Last line of the lexed region
+        ranges (dict): Tag ranges from _token_ranges
+    """
+    # Drop results for text that has been edited since, or a closed tab
+    if generation != getattr(editor, "_highlight_generation", None) or not editor.winfo_exists():
+        return
+    
+    text_widget = editor._textbox
+    region_start = f"{start_line}.0"
+    region_end = f"{end_line}.0 lineend"
+    
+    # Configure tags with theme colors once per theme, not on every pass
+    theme = get_theme()
+    if getattr(editor, "_tag_palette_theme", None) is not theme:
+        for tag, color in _TOKEN_TAG_COLORS:
+            text_widget.tag_configure(tag, foreground=get_color(color))
+        editor._tag_palette_theme = theme
+    
+    # Clear the old tags in the region
+    for tag, color in _TOKEN_TAG_COLORS:
+        text_widget.tag_remove(tag, region_start, region_end)
+    
+    for tag, indices in ranges.items():
+        text_widget.tag_add(tag, *indices)
+
+def _visible_lines(text_widget):
+    """
+    Get the first and last line numbers shown in a text widget
+    
+    Args:
+        text_widget: The Tkinter Text widget
+    
+    Returns:
+        tuple: (first, last) line numbers
+    """
+    first = int(text_widget.index("@0,0").split('.')[0])
+    last = int(text_widget.index(f"@0,{text_widget.winfo_height()}").split('.')[0])
+    return first, last
+
+def highlight_if_scrolled_out(editor):
+    """
+    Highlight the editor again if the view has left the highlighted lines
+    
+    Args:
+        editor: The EnhancedTextEditor widget
+    """
+    highlighted = getattr(editor, "_highlighted_lines", None)
+    first, last = _visible_lines(editor._textbox)
+    if highlighted is None or first < highlighted[0] or last > highlighted[1]:
+        highlight_syntax_debounced(editor)
+
+def highlight_syntax_debounced(editor, delay=_HIGHLIGHT_DELAY_MS):
+    """
+    Highlight the editor once typing pauses
+    
+    Each call pushes the pending highlight back, so a burst of keystrokes
+    is lexed once.
+    
+    Args:
+        editor: The EnhancedTextEditor widget
+        delay (int): Milliseconds to wait after the last call
+    """
+    job = getattr(editor, "_highlight_job", None)
+    if job is not None:
+        editor.after_cancel(job)
+    
+    # The text is changing, so lexing already in flight is out of date
+    _next_highlight_generation(editor)
+    
+    def run():
+        editor._highlight_job = None
+        # The tab may have been closed while waiting
+        if editor.winfo_exists():
+            highlight_syntax(editor)
+    
+    editor._highlight_job = editor.after(delay, run)
+
+def highlight_matching_brackets(editor, content=None):
     """
     Highlight matching brackets/parentheses around cursor
     
     Args:
         editor: The EnhancedTextEditor widget
+        content (str, optional): Editor text, if the caller already has it
     """
     text_widget = editor._textbox
-    content = editor.get("1.0", "end-1c")
+    if content is None:
+        content = get_code(editor)
     
     # Clear previous bracket matches
     text_widget.tag_remove("matching_bracket", "1.0", "end")
     
-    # Get cursor position
-    cursor_pos = editor.index(tk.INSERT)
-    line, col = map(int, cursor_pos.split('.'))
+    # Character offset of the cursor, computed by Tk in a single call
+    offset = (text_widget.count("1.0", tk.INSERT, "chars") or (0,))[0]
     
     # Bracket pairs
     brackets = {')': '(', ']': '[', '}': '{', '(': ')', '[': ']', '{': '}'}
     
     # Check character before and at cursor
     try:
-        char_before = editor.get(f"{line}.{col-1}", f"{line}.{col}")
-        char_at = editor.get(f"{line}.{col}", f"{line}.{col+1}")
-        
-        # Process if either character is a bracket
-        for char, pos in [(char_before, col-1), (char_at, col)]:
-            if char in brackets:
-                # Determine search direction and matching bracket
-                if char in '({[':
-                    # Forward search
-                    stack = 0
-                    for i in range(len(content)):
-                        idx = text_widget.index(f"{line}.{pos}") + " + %d chars" % i
-                        if text_widget.get(idx, idx + " + 1 chars") == char:
-                            stack += 1
-                        elif text_widget.get(idx, idx + " + 1 chars") == brackets[char]:
-                            stack -= 1
-                            if stack == 0:
-                                # Found matching closing bracket
-                                text_widget.tag_add("matching_bracket", f"{line}.{pos}", f"{line}.{pos+1}")
-                                text_widget.tag_add("matching_bracket", idx, idx + " + 1 chars")
-                                break
-                else:
-                    # Backward search
-                    stack = 0
-                    for i in range(len(content)):
-                        idx = text_widget.index(f"{line}.{pos}") + " - %d chars" % i
-                        if text_widget.get(idx, idx + " + 1 chars") == char:
-                            stack += 1
-                        elif text_widget.get(idx, idx + " + 1 chars") == brackets[char]:
-                            stack -= 1
-                            if stack == 0:
-                                # Found matching opening bracket
-                                text_widget.tag_add("matching_bracket", f"{line}.{pos}", f"{line}.{pos+1}")
-                                text_widget.tag_add("matching_bracket", idx, idx + " + 1 chars")
-                                break
+        for pos in (offset - 1, offset):
+            if pos < 0 or pos >= len(content):
+                continue
+            
+            char = content[pos]
+            if char not in brackets:
+                continue
+            
+            # Walk the text in Python rather than asking Tk for one
+            # character at a time
+            match = brackets[char]
+            step = 1 if char in '({[' else -1
+            stack = 0
+            i = pos
+            while 0 <= i < len(content):
+                if content[i] == char:
+                    stack += 1
+                elif content[i] == match:
+                    stack -= 1
+                    if stack == 0:
+                        # Found the matching bracket
+                        text_widget.tag_add("matching_bracket", "1.0 + %d chars" % pos, "1.0 + %d chars" % (pos + 1))
+                        text_widget.tag_add("matching_bracket", "1.0 + %d chars" % i, "1.0 + %d chars" % (i + 1))
+                        break
+                i += step
     except Exception as e:
         # Handle any exceptions during bracket matching
         pass
 
-def check_syntax_errors(editor):
+def check_syntax_errors(editor, content=None):
     """
     Check for basic syntax errors in C code
     
     Args:
         editor: The EnhancedTextEditor widget
+        content (str, optional): Editor text, if the caller already has it
     """
     # Clear existing errors
     if hasattr(editor, "clear_errors"):
         editor.clear_errors()
     
-    content = editor.get("1.0", "end-1c")
-    lines = content.split('\n')
+    if content is None:
+        content = get_code(editor)
     
-    # Basic error checks
-    for i, line in enumerate(lines, 1):
+    # Only visit candidate lines, found in one pass over the buffer instead
+    # of splitting it into a list of every line
+    errors = []
+    i = 1
+    pos = 0
+    for match in _ERROR_CANDIDATE_RE.finditer(content):
+        i += content.count('\n', pos, match.start())
+        pos = match.start()
+        line = match.group(0)
+        
         # Check for unclosed strings
-        if re.search(r'\"[^\"]*$', line) and not line.strip().endswith("\\"):
-            editor.mark_error(i, "Unclosed string literal")
+        if _UNCLOSED_STRING_RE.search(line) and not line.strip().endswith("\\"):
+            errors.append((i, "Unclosed string literal"))
         
         # Check for missing semicolons in statements (basic check)
-        if (re.search(r'^\s*(int|char|float|double|void)\s+\w+\s*=.+', line) and 
+        if (_INITIALIZED_DECL_RE.search(line) and 
             not line.strip().endswith(";") and 
             not line.strip().endswith("{")):
-            editor.mark_error(i, "Statement missing semicolon")
+            errors.append((i, "Statement missing semicolon"))
         
         # Check for unbalanced braces in the line
         open_braces = line.count('{')
         close_braces = line.count('}')
         if open_braces != close_braces and ('{' in line or '}' in line):
             # Only mark as error if it's not a function or block definition
-            if not re.search(r'^\s*\w+\s*\(.*\)\s*{', line):
-                editor.mark_error(i, "Unbalanced braces")
+            if not _BLOCK_HEADER_RE.search(line):
+                errors.append((i, "Unbalanced braces"))
+    
+    # Tag every error line in one call
+    editor.mark_errors(errors)
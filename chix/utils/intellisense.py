@@ -5,16 +5,30 @@ Provides code suggestions, function parameter info, etc.
 
 import re
 import os
+import heapq
+import bisect
+import mmap
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
-from chix.ui.theme import get_color
+from chix.ui.theme import get_color, get_theme
+from chix.core.buffer_cache import get_code
+
+# Project scans use RE2 when google-re2 is installed: it matches in linear
+# time, so unusual sources cannot make the scan backtrack
+try:
+    import re2 as _scan_re
+except ImportError:
+    _scan_re = re
 
 # C language keywords
-C_KEYWORDS = [
+C_KEYWORDS = frozenset({
     "auto", "break", "case", "char", "const", "continue", "default", "do", "double",
     "else", "enum", "extern", "float", "for", "goto", "if", "int", "long", "register",
     "return", "short", "signed", "sizeof", "static", "struct", "switch", "typedef",
     "union", "unsigned", "void", "volatile", "while"
-]
+})
 
 # C standard library functions with signatures
 C_STD_FUNCTIONS = {
@@ -46,10 +60,17 @@ C_STD_FUNCTIONS = {
 }
 
 # C preprocessor directives
-C_PREPROCESSOR = [
+C_PREPROCESSOR = frozenset({
     "#include", "#define", "#undef", "#ifdef", "#ifndef", "#if", "#else", "#elif", 
     "#endif", "#error", "#pragma"
-]
+})
+
+# Common C standard headers
+C_STD_HEADERS = frozenset({
+    "stdio.h", "stdlib.h", "string.h", "math.h", "ctype.h", "time.h",
+    "stdarg.h", "stddef.h", "errno.h", "float.h", "limits.h", "assert.h",
+    "signal.h", "setjmp.h", "locale.h", "iso646.h", "stdbool.h"
+})
 
 # Common C snippets
 C_SNIPPETS = {
@@ -69,6 +90,477 @@ C_SNIPPETS = {
     "include": "#include <stdio.h>\n#include <stdlib.h>",
 }
 
+def _snippet_cursor(code):
+    """
+    Find where the cursor goes after inserting a snippet
+    
+    That is the end of the first whitespace-only line (the empty body), or
+    the end of the snippet if it has none.
+    
+    Returns:
+        (int, int): (line offset, column) within the unindented snippet
+    """
+    lines = code.split('\n')
+    for row, text in enumerate(lines):
+        if text and not text.strip():
+            return row, len(text)
+    return len(lines) - 1, len(lines[-1])
+
+# Cursor position for each snippet, worked out once
+_SNIPPET_CURSORS = {name: _snippet_cursor(code) for name, code in C_SNIPPETS.items()}
+
+# Precompiled patterns for the per-keystroke context checks
+_TYPE_DECL_RE = re.compile(r'^\s*(int|char|float|double|void|struct|enum)\s+$')
+_TYPE_DECL_PREFIX_RE = re.compile(r'^\s*(int|char|float|double|void|struct|enum)\s+(\w*)$')
+_INCLUDE_OPEN_RE = re.compile(r'#include\s+[<"]')
+_STD_INCLUDE_RE = re.compile(r'#include\s+<([^>]*)$')
+_LOCAL_INCLUDE_RE = re.compile(r'#include\s+"([^"]*)$')
+_DIRECTIVE_RE = re.compile(r'#(\w*)$')
+_CALL_OPEN_RE = re.compile(r'(\w+)\s*\($')
+_INDENT_RE = re.compile(r'^(\s*)')
+_WORD_TAIL_RE = re.compile(r'[A-Za-z_]\w*\Z')
+
+# Only this many characters before the cursor are searched for the word
+# being typed; identifiers are far shorter
+_WORD_TAIL_WINDOW = 128
+
+# Precompiled patterns for symbol scanning
+_VAR_DECL_RE = re.compile(r'(int|char|float|double|long|short|unsigned|signed|struct\s+\w+|enum\s+\w+|\w+)\s+\*?(\w+)(?:\[.*\])?(?:\s*=\s*.+)?;')
+_FUNC_RE = _scan_re.compile(r'(int|void|char|float|double|long|short|unsigned|signed|struct\s+\w+|enum\s+\w+|\w+)\s+(\w+)\s*\((.*)\)')
+_TYPED_NAME_RE = re.compile(r'(.*?)(\w+)(?:\[.*\])?$')
+_STRUCT_RE = _scan_re.compile(r'struct\s+(\w+)\s*\{([^}]*)\}')
+_ENUM_RE = re.compile(r'enum\s+(\w+)\s*\{([^}]*)\}')
+_TYPEDEF_RE = re.compile(r'typedef\s+(.*?)\s+(\w+);')
+
+# Struct and function definitions in one alternation, so a project file is
+# scanned in a single pass; group 1 is a struct name, groups 2-4 a function
+_SYMBOL_RE = _scan_re.compile(r'struct\s+(\w+)\s*\{[^}]*\}|' + _FUNC_RE.pattern)
+
+# Byte version of the project scan pattern, run directly over file contents
+# and mappings; also on RE2 when available, since every project file is
+# scanned as bytes
+_SYMBOL_BYTES_RE = _scan_re.compile(_SYMBOL_RE.pattern.encode())
+
+# Files at least this large are memory-mapped instead of read into a string
+_MMAP_MIN_SIZE = 4096
+
+# Most entries taken from any one suggestion source
+_MAX_SUGGESTIONS = 50
+
+# Project functions offered, highest ranked first
+_MAX_FUNCTION_SUGGESTIONS = 10
+
+class _PrefixTrie:
+    """
+    Prefix tree mapping words to suggestion entries
+    
+    Lookups descend one node per prefix character and then only visit the
+    matching subtree, instead of testing every known word.
+    """
+    
+    def __init__(self):
+        self._root = {}
+    
+    def insert(self, word, entry):
+        """Store an entry under a word, replacing any previous entry"""
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None] = entry
+    
+    def prefix_search(self, prefix, limit=_MAX_SUGGESTIONS):
+        """
+        Find entries whose word starts with a prefix
+        
+        Args:
+            prefix (str): Prefix to match (case-sensitive)
+            limit (int): Maximum number of entries to return, or None for all
+            
+        Returns:
+            list: Matching entries in alphabetical order of their words
+        """
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        
+        # Depth-first walk; children are pushed in reverse so they pop in order
+        results = []
+        stack = [node]
+        while stack and (limit is None or len(results) < limit):
+            node = stack.pop()
+            entry = node.get(None)
+            if entry is not None:
+                results.append(entry)
+            stack.extend(node[char] for char in sorted((c for c in node if c is not None), reverse=True))
+        
+        return results
+
+class _RankedTrieNode:
+    """Node of a _RankedTrie"""
+    
+    __slots__ = ("children", "entry", "rank", "max_rank")
+    
+    def __init__(self):
+        self.children = {}
+        self.entry = None
+        self.rank = 0
+        self.max_rank = 0
+
+class _RankedTrie:
+    """
+    Prefix tree whose nodes remember the best rank stored below them
+    
+    top_k expands the most promising subtree first, so only the branches
+    that can still contribute one of the k best entries are visited.
+    """
+    
+    def __init__(self):
+        self._root = _RankedTrieNode()
+    
+    def insert(self, word, entry, rank=0):
+        """Store an entry under a word with the given rank"""
+        node = self._root
+        node.max_rank = max(node.max_rank, rank)
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _RankedTrieNode()
+            child.max_rank = max(child.max_rank, rank)
+            node = child
+        node.entry = entry
+        node.rank = rank
+    
+    def top_k(self, prefix, k=10):
+        """
+        Find the highest-ranked entries whose word starts with a prefix
+        
+        Args:
+            prefix (str): Prefix to match (case-sensitive)
+            k (int): Maximum number of entries to return
+            
+        Returns:
+            list: Up to k entries, highest rank first
+        """
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        
+        # Best-first search: subtrees are keyed by the best rank they can
+        # still yield and entries by their own rank, so an entry popped from
+        # the heap outranks everything left in it
+        tie = itertools.count()
+        heap = [(-node.max_rank, next(tie), node, False)]
+        results = []
+        while heap and len(results) < k:
+            _, _, node, is_entry = heapq.heappop(heap)
+            if is_entry:
+                results.append(node.entry)
+                continue
+            if node.entry is not None:
+                heapq.heappush(heap, (-node.rank, next(tie), node, True))
+            for child in node.children.values():
+                heapq.heappush(heap, (-child.max_rank, next(tie), child, False))
+        
+        return results
+
+# Icons shown before each suggestion type in the popup
+_SUGGESTION_ICONS = {
+    "keyword": "🔑",
+    "function": "🔧",
+    "variable": "📌",
+    "struct": "📦",
+    "enum": "📋",
+    "preprocessor": "⚙️",
+    "header": "📄",
+    "member": "🔹",
+    "snippet": "✂️",
+}
+
+def _format_suggestion(item):
+    """Get the popup text for a suggestion"""
+    text = item["text"]
+    item_type = item["type"]
+    
+    if item_type == "function":
+        text = f"{text}()"
+    
+    icon = _SUGGESTION_ICONS.get(item_type)
+    return f"{icon} {text}" if icon else text
+
+def _function_suggestion(func_name, details):
+    """Build the suggestion entry for a project function"""
+    params = ", ".join([f"{p['type']} {p['name']}" for p in details.get("params", [])])
+    signature = f"{details.get('return_type', 'void')} {func_name}({params})"
+    return {
+        "text": func_name,
+        "type": "function",
+        "desc": details.get("desc", "User-defined function"),
+        "signature": signature
+    }
+
+# Pause in typing (ms) before suggestions are computed
+_SUGGESTION_DELAY_MS = 60
+
+# Characters before the cursor examined when classifying its context
+_CONTEXT_WINDOW = 4096
+
+# Comments and literals, each matched whole or up to the end of the text
+# when unterminated
+_CONTEXT_TOKEN_RE = re.compile(r"""
+    (?P<line>//[^\n]*)
+  | (?P<block>/\*(?:[^*]|\*(?!/))*(?P<block_end>\*/)?)
+  | "(?:\\[\s\S]|[^"\\\n])*\\?(?P<string_end>")?
+  | '(?:\\[\s\S]|[^'\\\n])*\\?(?P<char_end>')?
+""", re.VERBOSE)
+
+def _scan_context(text):
+    """
+    Find out whether the end of text lies inside a comment or literal
+    
+    The text is tokenized by the regex engine, so only comments and
+    literals are visited from Python. Callers keep text bounded to a
+    window before the cursor.
+    
+    Args:
+        text (str): Source text ending at the cursor
+        
+    Returns:
+        str: "comment" or "string", or None for plain code
+    """
+    last = None
+    for last in _CONTEXT_TOKEN_RE.finditer(text):
+        pass
+    
+    # Only a token running into the cursor can contain it
+    if last is None or last.end() != len(text):
+        return None
+    
+    if last.group("line") is not None:
+        return "comment"
+    if last.group("block") is not None:
+        return None if last.group("block_end") else "comment"
+    if last.group("string_end") or last.group("char_end"):
+        return None
+    return "string"
+
+# Directories never searched for project sources
+_SKIPPED_DIRS = frozenset({".git", "build", "node_modules"})
+
+def _iter_source_files(root):
+    """
+    Yield directory entries for the C sources and headers below a directory
+    
+    Walks with os.scandir so file types come from the directory listing,
+    and prunes hidden and build directories as it goes.
+    
+    Args:
+        root (str): Directory to search
+        
+    Yields:
+        os.DirEntry: Entries for .c and .h files
+    """
+    pending = deque([root])
+    while pending:
+        try:
+            with os.scandir(pending.popleft()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIPPED_DIRS:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(('.c', '.h')):
+                        yield entry
+        except OSError:
+            # Skip directories we can't read
+            continue
+
+def _parse_file_symbols(content, file_name):
+    """
+    Extract function and struct definitions from a project source file
+    
+    This simplified scan only looks for function and struct definitions.
+    
+    Args:
+        content (str or bytes-like): Source text, or the raw bytes of a
+            memory-mapped file
+        file_name (str): File name used in the symbol descriptions
+        
+    Returns:
+        (dict, dict): (functions, structs) keyed by name; the first
+            definition in the file wins
+    """
+    functions = {}
+    structs = {}
+    
+    if isinstance(content, str):
+        matches = (match.groups() for match in _SYMBOL_RE.finditer(content))
+    else:
+        # Only the matched parts of a mapped file are decoded
+        matches = (
+            tuple(None if group is None else group.decode("utf-8", "replace") for group in match.groups())
+            for match in _SYMBOL_BYTES_RE.finditer(content)
+        )
+    
+    for struct_name, return_type, func_name, params_text in matches:
+        # Simplified struct scanning
+        if struct_name is not None:
+            if struct_name not in structs:
+                structs[struct_name] = {
+                    "members": {},
+                    "desc": f"From {file_name}"
+                }
+            continue
+        
+        # Function declarations/definitions
+        if func_name in functions:
+            continue
+        
+        # Parse parameters simplified
+        params = []
+        if params_text.strip() and params_text.strip() != "void":
+            param_parts = params_text.split(',')
+            for part in param_parts:
+                part = part.strip()
+                if part:
+                    params.append({"type": "param", "name": part})
+        
+        functions[func_name] = {
+            "return_type": return_type,
+            "params": params,
+            "desc": f"From {file_name}"
+        }
+    
+    return functions, structs
+
+def _read_file_symbols(file_path):
+    """
+    Read a project source file and extract its symbols
+    
+    Safe to call from worker threads; it touches no shared state.
+    
+    Args:
+        file_path (str): File to read
+        
+    Returns:
+        (dict, dict): (functions, structs) as from _parse_file_symbols,
+            or None if the file could not be read
+    """
+    file_name = os.path.basename(file_path)
+    
+    try:
+        # Files are scanned as bytes so only the matched names get decoded
+        with open(file_path, 'rb') as f:
+            # Scan large files in place through a read-only mapping
+            if os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return _parse_file_symbols(mapped, file_name)
+            
+            content = f.read()
+    except Exception:
+        return None
+    
+    return _parse_file_symbols(content, file_name)
+
+def _scan_project(dir_path, file_cache):
+    """
+    Bring the parsed files of a project up to date
+    
+    Files whose modification time and size are unchanged reuse their cached
+    symbols; the rest are read and parsed on a thread pool. file_cache is
+    only read.
+    
+    Args:
+        dir_path (str): Project directory
+        file_cache (dict): Previous result for this directory, or None to
+            parse every file
+        
+    Returns:
+        (list, dict): Source file paths in walk order, and the new
+            path -> ((mtime_ns, size), functions, structs) cache
+    """
+    if file_cache is None:
+        file_cache = {}
+    
+    # Stat every source file and collect the ones that need parsing
+    paths = []
+    stale = []
+    updated = {}
+    for entry in _iter_source_files(dir_path):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        
+        key = (st.st_mtime_ns, st.st_size)
+        paths.append(entry.path)
+        cached = file_cache.get(entry.path)
+        if cached is None or cached[0] != key:
+            stale.append((entry.path, key))
+        else:
+            updated[entry.path] = cached
+    
+    # Read and parse changed files in parallel
+    if stale:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            results = pool.map(_read_file_symbols, [path for path, _ in stale])
+            for (path, key), result in zip(stale, results):
+                if result is not None:
+                    updated[path] = (key,) + result
+    
+    # Files that disappeared are not carried over
+    return paths, updated
+
+def _prefix_slice(sorted_words, prefix, limit=_MAX_SUGGESTIONS):
+    """
+    Get the words starting with a prefix from a sorted list
+    
+    Args:
+        sorted_words (list): Words in ascending order
+        prefix (str): Prefix to match (case-sensitive)
+        limit (int, optional): Maximum number of words, or None for all
+        
+    Returns:
+        list: Matching words, in order
+    """
+    lo = bisect.bisect_left(sorted_words, prefix)
+    hi = bisect.bisect_left(sorted_words, prefix + "\U0010ffff", lo)
+    if limit is not None:
+        hi = min(hi, lo + limit)
+    return sorted_words[lo:hi]
+
+def _build_trie(entries):
+    """Build a prefix trie from (word, entry) pairs"""
+    trie = _PrefixTrie()
+    for word, entry in entries:
+        trie.insert(word, entry)
+    return trie
+
+# Prebuilt tries for the fixed suggestion sources
+_KEYWORD_TRIE = _build_trie(
+    (keyword, {"text": keyword, "type": "keyword", "desc": "C keyword"})
+    for keyword in C_KEYWORDS
+)
+_STD_FUNCTION_TRIE = _build_trie(
+    (func, {
+        "text": func,
+        "type": "function",
+        "desc": details["desc"],
+        "signature": details["signature"]
+    })
+    for func, details in C_STD_FUNCTIONS.items()
+)
+# Sorted copies of the fixed lists for bisect prefix lookups
+_SORTED_STD_HEADERS = sorted(C_STD_HEADERS)
+_SORTED_DIRECTIVE_NAMES = sorted(directive[1:] for directive in C_PREPROCESSOR)
+
+_SNIPPET_TRIE = _build_trie(
+    (name, {"text": name, "type": "snippet", "desc": f"Snippet: {name}", "code": code})
+    for name, code in C_SNIPPETS.items()
+)
+
 class Intellisense:
     """
     Provides code intelligence features for the editor
@@ -87,6 +579,16 @@ class Intellisense:
         self.suggestion_window = None
         self.param_info_window = None
         
+        # Suggestion popup widgets, built on first use and then hidden and
+        # shown again, plus the theme they were colored with
+        self._suggestion_popup = None
+        self._suggestion_listbox = None
+        self._suggestion_desc = None
+        self._popup_theme = None
+        
+        # Scheduled suggestion update, if any
+        self._pending_after_id = None
+        
         # Project-specific symbols
         self.project_symbols = {
             "variables": {},  # name -> type
@@ -96,6 +598,39 @@ class Intellisense:
             "typedefs": {},   # alias -> original
         }
         
+        # Number of project files defining each function, and the trie
+        # ranking function completions by it
+        self._function_ranks = {}
+        self._function_trie = _RankedTrie()
+        
+        # Parsed project files: path -> ((mtime_ns, size), functions, structs),
+        # and the project directory they were last scanned for
+        self._file_cache = {}
+        self._scanned_dir = None
+        
+        # Sorted .h files of the current directory: (dir_path, mtime_ns, names)
+        self._header_cache = None
+        
+        # Prefix tries over the names of the other symbol categories, grown
+        # as symbols are added
+        self._symbol_tries = {
+            "variables": _PrefixTrie(),
+            "structs": _PrefixTrie(),
+            "enums": _PrefixTrie(),
+            "typedefs": _PrefixTrie(),
+        }
+        
+        # Variable declarations found per line of the current file, keyed by
+        # line text so only edited lines are matched again
+        self._line_var_cache = {}
+        
+        # Bumped whenever project symbols change, invalidating the
+        # single-entry cache of the last general suggestion list
+        self._symbols_version = 0
+        self._general_cache_key = None
+        self._general_cache_value = None
+        self._general_cache_complete = False
+        
         # Set up event bindings
         self._setup_events()
     
@@ -135,7 +670,22 @@ class Intellisense:
         return None  # Allow default handling
     
     def _trigger_suggestions(self, event=None):
-        """Trigger code suggestions"""
+        """Trigger code suggestions once typing pauses"""
+        # Coalesce bursts of keystrokes into a single update
+        self._cancel_pending_suggestions()
+        self._pending_after_id = self.editor.after(_SUGGESTION_DELAY_MS, self._do_trigger_suggestions)
+        return None  # Allow default handling
+    
+    def _cancel_pending_suggestions(self):
+        """Cancel a scheduled suggestion update"""
+        if self._pending_after_id is not None:
+            self.editor.after_cancel(self._pending_after_id)
+            self._pending_after_id = None
+    
+    def _do_trigger_suggestions(self):
+        """Compute and show code suggestions for the cursor position"""
+        self._pending_after_id = None
+        
         # Get current line and position
         cursor_pos = self.editor.index(tk.INSERT)
         line, col = map(int, cursor_pos.split('.'))
@@ -143,22 +693,24 @@ class Intellisense:
         # Get text up to cursor on current line
         line_text = self.editor.get(f"{line}.0", f"{line}.{col}")
         
-        # Check for special cases
-        if line_text.strip().startswith('#'):
+        # Check for special cases; includes come first since their header
+        # name may look like an unterminated string
+        if _INCLUDE_OPEN_RE.search(line_text):
+            # After #include directive
+            self._show_header_suggestions(line_text)
+        elif _scan_context(self.editor.get(f"{tk.INSERT} - {_CONTEXT_WINDOW} chars", tk.INSERT)):
+            # Nothing to suggest inside comments and string literals
+            self._dismiss_suggestions()
+        elif line_text.strip().startswith('#'):
             # After preprocessor directive
             self._show_preprocessor_suggestions(line_text)
-        elif re.search(r'^\s*(int|char|float|double|void|struct|enum)\s+$', line_text):
+        elif _TYPE_DECL_RE.search(line_text):
             # After type declaration
             self._show_variable_suggestions(line_text)
-        elif re.search(r'#include\s+[<"]', line_text):
-            # After #include directive
-            self._show_header_suggestions(line_text)
         else:
             # General suggestions
             word = self._get_current_word(line_text)
             self._show_general_suggestions(word)
-        
-        return None  # Allow default handling
     
     def _trigger_member_suggestions(self, event=None):
         """Trigger struct/pointer member suggestions"""
@@ -175,95 +727,40 @@ class Intellisense:
         # Get the struct/pointer variable
         line_text = self.editor.get(f"{line}.0", f"{line}.{col}")
         
-        # Extract variable name before . or ->
+        # Extract variable name before . or -> (the segment between the last
+        # two separators), without splitting the whole line
         if '.' in line_text:
-            var_name = line_text.split('.')[-2].strip()
+            head = line_text.rpartition('.')[0]
+            var_name = head.rpartition('.')[2].strip()
             self._show_member_suggestions(var_name)
         elif '->' in line_text:
-            var_name = line_text.split('->')[-2].strip()
+            head = line_text.rpartition('->')[0]
+            var_name = head.rpartition('->')[2].strip()
             self._show_member_suggestions(var_name, is_pointer=True)
         
         return None  # Allow default handling
     
     def _show_general_suggestions(self, prefix=""):
         """Show general code suggestions"""
-        suggestions = []
-        
-        # Add keywords if they match prefix
-        for keyword in C_KEYWORDS:
-            if keyword.startswith(prefix):
-                suggestions.append({
-                    "text": keyword,
-                    "type": "keyword",
-                    "desc": "C keyword"
-                })
-        
-        # Add standard functions
-        for func, details in C_STD_FUNCTIONS.items():
-            if func.startswith(prefix):
-                suggestions.append({
-                    "text": func,
-                    "type": "function",
-                    "desc": details["desc"],
-                    "signature": details["signature"]
-                })
-        
-        # Add project symbols
-        # Variables
-        for var, var_type in self.project_symbols["variables"].items():
-            if var.startswith(prefix):
-                suggestions.append({
-                    "text": var,
-                    "type": "variable",
-                    "desc": f"Variable of type {var_type}"
-                })
-        
-        # Functions
-        for func, details in self.project_symbols["functions"].items():
-            if func.startswith(prefix):
-                params = ", ".join([f"{p['type']} {p['name']}" for p in details.get("params", [])])
-                signature = f"{details.get('return_type', 'void')} {func}({params})"
-                suggestions.append({
-                    "text": func,
-                    "type": "function",
-                    "desc": details.get("desc", "User-defined function"),
-                    "signature": signature
-                })
-        
-        # Structs, enums, typedefs
-        for struct_name in self.project_symbols["structs"]:
-            if struct_name.startswith(prefix):
-                suggestions.append({
-                    "text": struct_name,
-                    "type": "struct",
-                    "desc": "User-defined struct"
-                })
-        
-        for enum_name in self.project_symbols["enums"]:
-            if enum_name.startswith(prefix):
-                suggestions.append({
-                    "text": enum_name,
-                    "type": "enum",
-                    "desc": "User-defined enum"
-                })
-        
-        for typedef, original in self.project_symbols["typedefs"].items():
-            if typedef.startswith(prefix):
-                suggestions.append({
-                    "text": typedef,
-                    "type": "typedef",
-                    "desc": f"Type alias for {original}"
-                })
-        
-        # Add snippets
-        for snippet_name, snippet_code in C_SNIPPETS.items():
-            if snippet_name.startswith(prefix):
-                suggestions.append({
-                    "text": snippet_name,
-                    "type": "snippet",
-                    "desc": f"Snippet: {snippet_name}",
-                    "code": snippet_code
-                })
+        # Typing often asks for the same prefix again (e.g. after a space),
+        # so the last result is kept until the prefix or the symbols change
+        key = (prefix, self._symbols_version)
+        cached_key = self._general_cache_key
+        if key == cached_key:
+            suggestions = self._general_cache_value
+        elif (self._general_cache_complete
+              and cached_key[1] == self._symbols_version
+              and prefix.startswith(cached_key[0])):
+            # The last result held every match for a shorter prefix, so the
+            # matches for this one are among them
+            suggestions = [item for item in self._general_cache_value if item["text"].startswith(prefix)]
+            self._general_cache_key = key
+            self._general_cache_value = suggestions
+        else:
+            suggestions, complete = self._general_suggestions(prefix)
+            self._general_cache_key = key
+            self._general_cache_value = suggestions
+            self._general_cache_complete = complete
         
         # Show suggestions window if we have any
         if suggestions:
@@ -271,21 +768,107 @@ class Intellisense:
         else:
             self._dismiss_suggestions()
     
+    def _general_suggestions(self, prefix):
+        """
+        Collect general code suggestions for a prefix
+        
+        Returns:
+            (list, bool): Suggestions, and whether no source was cut off at
+                its cap, i.e. the list holds every match
+        """
+        # Keywords and standard functions matching the prefix
+        keywords = _KEYWORD_TRIE.prefix_search(prefix)
+        std_functions = _STD_FUNCTION_TRIE.prefix_search(prefix)
+        
+        # Project symbols; functions most widely defined first
+        variable_names = self._names_with_prefix("variables", prefix)
+        functions = self._function_trie.top_k(prefix, k=_MAX_FUNCTION_SUGGESTIONS)
+        struct_names = self._names_with_prefix("structs", prefix)
+        enum_names = self._names_with_prefix("enums", prefix)
+        typedef_names = self._names_with_prefix("typedefs", prefix)
+        
+        # Snippets
+        snippets = _SNIPPET_TRIE.prefix_search(prefix)
+        
+        complete = len(functions) < _MAX_FUNCTION_SUGGESTIONS and all(
+            len(found) < _MAX_SUGGESTIONS
+            for found in (keywords, std_functions, variable_names, struct_names, enum_names, typedef_names, snippets)
+        )
+        
+        suggestions = keywords + std_functions
+        
+        variables = self.project_symbols["variables"]
+        for var in variable_names:
+            suggestions.append({
+                "text": var,
+                "type": "variable",
+                "desc": f"Variable of type {variables[var]}"
+            })
+        
+        suggestions += functions
+        
+        for struct_name in struct_names:
+            suggestions.append({
+                "text": struct_name,
+                "type": "struct",
+                "desc": "User-defined struct"
+            })
+        
+        for enum_name in enum_names:
+            suggestions.append({
+                "text": enum_name,
+                "type": "enum",
+                "desc": "User-defined enum"
+            })
+        
+        typedefs = self.project_symbols["typedefs"]
+        for typedef in typedef_names:
+            suggestions.append({
+                "text": typedef,
+                "type": "typedef",
+                "desc": f"Type alias for {typedefs[typedef]}"
+            })
+        
+        suggestions += snippets
+        
+        return suggestions, complete
+    
+    def _names_with_prefix(self, category, prefix, limit=_MAX_SUGGESTIONS):
+        """Get the sorted names in a project symbol category starting with prefix"""
+        return self._symbol_tries[category].prefix_search(prefix, limit)
+    
+    def add_symbols(self, category, names):
+        """
+        Index project symbols for completion
+        
+        Args:
+            category (str): Key of project_symbols the names belong to
+            names: Names already stored in project_symbols[category]
+        """
+        self._symbols_version += 1
+        if category == "functions":
+            for func_name in names:
+                self._index_function(func_name)
+        else:
+            trie = self._symbol_tries[category]
+            for name in names:
+                trie.insert(name, name)
+    
     def _show_preprocessor_suggestions(self, text):
         """Show preprocessor directive suggestions"""
         # Extract current directive
-        match = re.search(r'#(\w*)$', text)
+        match = _DIRECTIVE_RE.search(text)
         if match:
             prefix = match.group(1)
             suggestions = []
             
-            for directive in C_PREPROCESSOR:
-                if directive[1:].startswith(prefix):
-                    suggestions.append({
-                        "text": directive,
-                        "type": "preprocessor",
-                        "desc": f"Preprocessor directive: {directive}"
-                    })
+            for name in _prefix_slice(_SORTED_DIRECTIVE_NAMES, prefix):
+                directive = f"#{name}"
+                suggestions.append({
+                    "text": directive,
+                    "type": "preprocessor",
+                    "desc": f"Preprocessor directive: {directive}"
+                })
             
             if suggestions:
                 self._show_suggestions_window(suggestions)
@@ -293,7 +876,7 @@ class Intellisense:
     def _show_variable_suggestions(self, text):
         """Show suggestions after type declarations"""
         # Type declaration followed by incomplete variable name
-        match = re.search(r'^\s*(int|char|float|double|void|struct|enum)\s+(\w*)$', text)
+        match = _TYPE_DECL_PREFIX_RE.search(text)
         if match:
             type_name = match.group(1)
             prefix = match.group(2)
@@ -301,31 +884,33 @@ class Intellisense:
             # Suggest variables of similar types from current file or project
             suggestions = []
             
-            for var, var_type in self.project_symbols["variables"].items():
-                if var_type == type_name and var.startswith(prefix):
-                    suggestions.append({
-                        "text": var,
-                        "type": "variable",
-                        "desc": f"Existing variable of type {var_type}"
-                    })
+            variables = self.project_symbols["variables"]
+            matching = (
+                var for var in self._names_with_prefix("variables", prefix, limit=None)
+                if variables[var] == type_name
+            )
+            for var in itertools.islice(matching, _MAX_SUGGESTIONS):
+                suggestions.append({
+                    "text": var,
+                    "type": "variable",
+                    "desc": f"Existing variable of type {type_name}"
+                })
             
             # If it's struct or enum, suggest known ones
             if type_name == "struct":
-                for struct_name in self.project_symbols["structs"]:
-                    if struct_name.startswith(prefix):
-                        suggestions.append({
-                            "text": struct_name,
-                            "type": "struct",
-                            "desc": "User-defined struct"
-                        })
+                for struct_name in self._names_with_prefix("structs", prefix):
+                    suggestions.append({
+                        "text": struct_name,
+                        "type": "struct",
+                        "desc": "User-defined struct"
+                    })
             elif type_name == "enum":
-                for enum_name in self.project_symbols["enums"]:
-                    if enum_name.startswith(prefix):
-                        suggestions.append({
-                            "text": enum_name,
-                            "type": "enum",
-                            "desc": "User-defined enum"
-                        })
+                for enum_name in self._names_with_prefix("enums", prefix):
+                    suggestions.append({
+                        "text": enum_name,
+                        "type": "enum",
+                        "desc": "User-defined enum"
+                    })
             
             if suggestions:
                 self._show_suggestions_window(suggestions)
@@ -334,33 +919,25 @@ class Intellisense:
         """Show suggestions for header files in #include statements"""
         # Extract partial header name
         if '<' in text:
-            match = re.search(r'#include\s+<([^>]*)$', text)
+            match = _STD_INCLUDE_RE.search(text)
             if match:
                 prefix = match.group(1)
                 self._show_standard_headers(prefix)
         elif '"' in text:
-            match = re.search(r'#include\s+"([^"]*)$', text)
+            match = _LOCAL_INCLUDE_RE.search(text)
             if match:
                 prefix = match.group(1)
                 self._show_project_headers(prefix)
     
     def _show_standard_headers(self, prefix=""):
         """Show suggestions for standard C headers"""
-        # List of common C standard headers
-        std_headers = [
-            "stdio.h", "stdlib.h", "string.h", "math.h", "ctype.h", "time.h",
-            "stdarg.h", "stddef.h", "errno.h", "float.h", "limits.h", "assert.h",
-            "signal.h", "setjmp.h", "locale.h", "iso646.h", "stdbool.h"
-        ]
-        
         suggestions = []
-        for header in std_headers:
-            if header.startswith(prefix):
-                suggestions.append({
-                    "text": header,
-                    "type": "header",
-                    "desc": f"Standard header file: {header}"
-                })
+        for header in _prefix_slice(_SORTED_STD_HEADERS, prefix):
+            suggestions.append({
+                "text": header,
+                "type": "header",
+                "desc": f"Standard header file: {header}"
+            })
         
         if suggestions:
             self._show_suggestions_window(suggestions)
@@ -371,22 +948,39 @@ class Intellisense:
         
         # Try to find project headers in the current directory and project
         if "current_directory" in self.state:
-            dir_path = self.state["current_directory"]
-            
-            try:
-                for filename in os.listdir(dir_path):
-                    if filename.endswith('.h') and filename.startswith(prefix):
-                        suggestions.append({
-                            "text": filename,
-                            "type": "header",
-                            "desc": f"Project header file: {filename}"
-                        })
-            except Exception:
-                pass
+            for filename in _prefix_slice(self._get_project_headers(), prefix):
+                suggestions.append({
+                    "text": filename,
+                    "type": "header",
+                    "desc": f"Project header file: {filename}"
+                })
         
         if suggestions:
             self._show_suggestions_window(suggestions)
     
+    def _get_project_headers(self):
+        """
+        Get the sorted .h file names in the current directory
+        
+        The listing is reused until the directory's modification time changes.
+        """
+        dir_path = self.state["current_directory"]
+        
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            cache = self._header_cache
+            if cache is None or cache[0] != dir_path or cache[1] != mtime_ns:
+                with os.scandir(dir_path) as it:
+                    headers = sorted(
+                        entry.name for entry in it
+                        if entry.name.endswith('.h') and entry.is_file()
+                    )
+                cache = self._header_cache = (dir_path, mtime_ns, headers)
+        except Exception:
+            return []
+        
+        return cache[2]
+    
     def _show_member_suggestions(self, struct_var, is_pointer=False):
         """Show suggestions for struct or pointer members"""
         # Find the struct type of the variable
@@ -422,7 +1016,7 @@ class Intellisense:
         line_text = self.editor.get(f"{line}.0", f"{line}.{col}")
         
         # Find the function name before the opening parenthesis
-        match = re.search(r'(\w+)\s*\($', line_text)
+        match = _CALL_OPEN_RE.search(line_text)
         if match:
             func_name = match.group(1)
             
@@ -461,84 +1055,72 @@ class Intellisense:
     
     def _show_suggestions_window(self, suggestions):
         """Display the suggestions window"""
-        # Close existing window
-        if self.suggestion_window:
-            self.suggestion_window.destroy()
-        
         # Get cursor position on screen
         cursor_pos = self.editor.index(tk.INSERT)
-        line, col = map(int, cursor_pos.split('.'))
         x, y, width, height = self.editor._textbox.bbox(cursor_pos)
         
         # Convert to screen coordinates
         x_screen = self.editor.winfo_rootx() + x
         y_screen = self.editor.winfo_rooty() + y + height
         
-        # Create suggestion window
-        self.suggestion_window = tk.Toplevel(self.editor)
-        self.suggestion_window.wm_overrideredirect(True)  # No window decorations
-        self.suggestion_window.wm_geometry(f"+{x_screen}+{y_screen}")
+        # Reuse the popup; only a theme switch requires recoloring it
+        if self._suggestion_popup is None:
+            self._build_suggestion_popup()
+        theme = get_theme()
+        if theme is not self._popup_theme:
+            self._color_suggestion_popup(theme)
         
-        # Configure window appearance
-        self.suggestion_window.configure(bg=get_color("bg_secondary"))
-        self.suggestion_window.bind("<FocusOut>", self._dismiss_suggestions)
+        popup = self._suggestion_popup
+        listbox = self._suggestion_listbox
+        popup.wm_geometry(f"+{x_screen}+{y_screen}")
+        
+        # Store suggestions for future use, with their lowercase text for filtering
+        self.current_suggestions = suggestions
+        self._suggestions_lower = [item["text"].lower() for item in suggestions]
+        
+        listbox.configure(height=min(10, len(suggestions)))
+        self._fill_suggestion_listbox(suggestions)
+        
+        # Trigger initial description display
+        self._on_suggestion_select()
+        
+        popup.deiconify()
+        self.suggestion_window = popup
+    
+    def _fill_suggestion_listbox(self, suggestions):
+        """
+        Replace the listbox rows with suggestions and select the first one
+        
+        Only the first _MAX_SUGGESTIONS rows are inserted, in a single call;
+        the rest become visible as typing narrows the list.
+        """
+        listbox = self._suggestion_listbox
+        listbox.delete(0, tk.END)
+        if suggestions:
+            listbox.insert(tk.END, *[_format_suggestion(item) for item in suggestions[:_MAX_SUGGESTIONS]])
+            listbox.selection_set(0)
+    
+    def _build_suggestion_popup(self):
+        """Create the suggestion popup widgets, initially hidden"""
+        popup = tk.Toplevel(self.editor)
+        popup.withdraw()
+        popup.wm_overrideredirect(True)  # No window decorations
+        popup.bind("<FocusOut>", self._dismiss_suggestions)
         
         # Create listbox for suggestions
         listbox = tk.Listbox(
-            self.suggestion_window,
-            height=min(10, len(suggestions)),
+            popup,
             width=50,
-            bg=get_color("bg_secondary"),
-            fg=get_color("fg_primary"),
-            selectbackground=get_color("selection"),
-            selectforeground=get_color("fg_primary"),
             font=("Cascadia Code", 11),
             bd=1
         )
         
-        # Fill listbox with suggestions
-        for i, item in enumerate(suggestions):
-            text = item["text"]
-            item_type = item["type"]
-            
-            # Format based on type
-            if item_type == "keyword":
-                text = f"🔑 {text}"
-            elif item_type == "function":
-                text = f"🔧 {text}()"
-            elif item_type == "variable":
-                text = f"📌 {text}"
-            elif item_type == "struct":
-                text = f"📦 {text}"
-            elif item_type == "enum":
-                text = f"📋 {text}"
-            elif item_type == "preprocessor":
-                text = f"⚙️ {text}"
-            elif item_type == "header":
-                text = f"📄 {text}"
-            elif item_type == "member":
-                text = f"🔹 {text}"
-            elif item_type == "snippet":
-                text = f"✂️ {text}"
-            
-            listbox.insert(tk.END, text)
-        
-        # Select first item by default
-        if suggestions:
-            listbox.selection_set(0)
-        
         # Add description frame
-        desc_frame = tk.Frame(
-            self.suggestion_window,
-            bg=get_color("bg_tertiary"),
-            height=60
-        )
+        desc_frame = tk.Frame(popup, height=60)
         
         desc_label = tk.Label(
             desc_frame,
             text="",
-            bg=get_color("bg_tertiary"),
-            fg=get_color("fg_primary"),
             font=("Arial", 10),
             anchor="w",
             justify="left",
@@ -548,33 +1130,45 @@ class Intellisense:
         )
         desc_label.pack(fill="both", expand=True)
         
-        # Update description on selection change
-        def on_select(event):
-            selected = listbox.curselection()
-            if selected:
-                index = selected[0]
-                if 0 <= index < len(suggestions):
-                    selected_item = suggestions[index]
-                    desc_text = selected_item["desc"]
-                    
-                    if "signature" in selected_item:
-                        desc_text = f"{selected_item['signature']}\n{desc_text}"
-                    
-                    desc_label.config(text=desc_text)
-        
-        listbox.bind("<<ListboxSelect>>", on_select)
-        listbox.bind("<Return>", lambda e: self._complete_selection(suggestions, listbox))
-        listbox.bind("<Double-Button-1>", lambda e: self._complete_selection(suggestions, listbox))
+        # Handlers read current_suggestions, which follows the filtering
+        listbox.bind("<<ListboxSelect>>", self._on_suggestion_select)
+        listbox.bind("<Return>", lambda e: self._complete_selection(self.current_suggestions, listbox))
+        listbox.bind("<Double-Button-1>", lambda e: self._complete_selection(self.current_suggestions, listbox))
         
         # Pack the widgets
         listbox.pack(fill="both", expand=True)
         desc_frame.pack(fill="x")
         
-        # Trigger initial description display
-        on_select(None)
-        
-        # Store suggestions for future use
-        self.current_suggestions = suggestions
+        self._suggestion_popup = popup
+        self._suggestion_listbox = listbox
+        self._suggestion_desc = desc_label
+    
+    def _color_suggestion_popup(self, theme):
+        """Apply theme colors to the suggestion popup"""
+        self._suggestion_popup.configure(bg=theme["bg_secondary"])
+        self._suggestion_listbox.configure(
+            bg=theme["bg_secondary"],
+            fg=theme["fg_primary"],
+            selectbackground=theme["selection"],
+            selectforeground=theme["fg_primary"]
+        )
+        self._suggestion_desc.master.configure(bg=theme["bg_tertiary"])
+        self._suggestion_desc.configure(bg=theme["bg_tertiary"], fg=theme["fg_primary"])
+        self._popup_theme = theme
+    
+    def _on_suggestion_select(self, event=None):
+        """Show the description of the selected suggestion"""
+        selected = self._suggestion_listbox.curselection()
+        if selected:
+            index = selected[0]
+            if 0 <= index < len(self.current_suggestions):
+                selected_item = self.current_suggestions[index]
+                desc_text = selected_item["desc"]
+                
+                if "signature" in selected_item:
+                    desc_text = f"{selected_item['signature']}\n{desc_text}"
+                
+                self._suggestion_desc.config(text=desc_text)
     
     def _show_param_info_window(self, func_name, signature, description):
         """Display parameter information window"""
@@ -733,7 +1327,7 @@ class Intellisense:
         """Try to complete current suggestion on Tab key"""
         if self.suggestion_window and hasattr(self, "current_suggestions"):
             # Get the listbox widget
-            listbox = self.suggestion_window.winfo_children()[0]
+            listbox = self._suggestion_listbox
             selected = listbox.curselection()
             
             if selected:
@@ -748,34 +1342,19 @@ class Intellisense:
     
     def _insert_suggestion(self, suggestion):
         """Insert the selected suggestion at cursor position"""
-        # Get current word and cursor position
+        # Get cursor position
         cursor_pos = self.editor.index(tk.INSERT)
         line, col = map(int, cursor_pos.split('.'))
-        line_text = self.editor.get(f"{line}.0", f"{line}.{col}")
-        
-        # Find word start position
-        word_start = col
-        for i in range(col-1, -1, -1):
-            if i < len(line_text) and not (line_text[i].isalnum() or line_text[i] == '_'):
-                word_start = i + 1
-                break
-        
-        # Replace current word with suggestion
         text = suggestion["text"]
-        self.editor.delete(f"{line}.{word_start}", f"{line}.{col}")
         
         # Handle different types of suggestions
-        if suggestion["type"] == "function":
-            # Add parentheses for functions
-            self.editor.insert(f"{line}.{word_start}", f"{text}()")
-            # Position cursor between parentheses
-            self.editor.mark_set(tk.INSERT, f"{line}.{word_start + len(text) + 1}")
-        elif suggestion["type"] == "snippet":
+        if suggestion["type"] == "snippet":
             # Insert snippet code
             code = suggestion["code"]
             
             # Calculate indentation
-            indent_match = re.match(r'^(\s*)', line_text)
+            line_text = self.editor.get(f"{line}.0", cursor_pos)
+            indent_match = _INDENT_RE.match(line_text)
             indent = indent_match.group(1) if indent_match else ""
             
             # Apply indentation to each line
@@ -786,30 +1365,37 @@ class Intellisense:
             self.editor.delete(f"{line}.0", f"{line}.0 lineend")
             self.editor.insert(f"{line}.0", indented_code)
             
-            # Position cursor at a logical place (after first parentheses or at indented line)
-            cursor_pos = indented_code.find("{}") + 1 if "{}" in indented_code else indented_code.find(");") + 1
-            if cursor_pos > 0:
-                self.editor.mark_set(tk.INSERT, f"{line}.{cursor_pos}")
-            else:
-                # Find first indented line
-                code_lines = indented_code.split('\n')
-                if len(code_lines) > 1:
-                    first_line = code_lines[0]
-                    second_line = code_lines[1]
-                    
-                    # Position cursor at indentation on second line plus one tab
-                    indent_len = len(second_line) - len(second_line.lstrip())
-                    self.editor.mark_set(tk.INSERT, f"{line+1}.{indent_len + 4}")
+            # Position cursor in the snippet body; lines after the first carry the indent
+            row, cursor_col = _SNIPPET_CURSORS.get(suggestion["text"]) or _snippet_cursor(code)
+            if row > 0:
+                cursor_col += len(indent)
+            self.editor.mark_set(tk.INSERT, f"{line + row}.{cursor_col}")
+            return
+        
+        # The partial word being completed ends at the cursor and fits in the
+        # window _get_current_word searches, so only that tail is read back
+        window_start = max(0, col - _WORD_TAIL_WINDOW)
+        tail = self.editor.get(f"{line}.{window_start}", cursor_pos)
+        word_start = col - len(self._get_current_word(tail))
+        
+        # Replace only the partial word with the suggestion
+        self.editor.delete(f"{line}.{word_start}", cursor_pos)
+        
+        if suggestion["type"] == "function":
+            # Add parentheses for functions
+            self.editor.insert(f"{line}.{word_start}", f"{text}()")
+            # Position cursor between parentheses
+            self.editor.mark_set(tk.INSERT, f"{line}.{word_start + len(text) + 1}")
         else:
             # For other types, just insert the text
             self.editor.insert(f"{line}.{word_start}", text)
     
     def _get_current_word(self, line_text):
         """Extract the current word being typed"""
-        # Find last non-word character
-        match = re.search(r'[^\w_]*(\w*)$', line_text)
+        # Match the identifier ending at the cursor within a bounded window
+        match = _WORD_TAIL_RE.search(line_text, max(0, len(line_text) - _WORD_TAIL_WINDOW))
         if match:
-            return match.group(1)
+            return match.group(0)
         return ""
     
     def _update_suggestions(self):
@@ -831,53 +1417,31 @@ class Intellisense:
             current_word = self._get_current_word(self.editor.get(f"{line}.0", f"{line}.{col}"))
             if current_word:
                 # Filter suggestions based on current word
-                filtered = [s for s in self.current_suggestions 
-                          if s["text"].lower().startswith(current_word.lower())]
+                word_lower = current_word.lower()
+                kept = [
+                    (item, lower)
+                    for item, lower in zip(self.current_suggestions, self._suggestions_lower)
+                    if lower.startswith(word_lower)
+                ]
+                filtered = [item for item, _ in kept]
                 
                 if filtered and filtered != self.current_suggestions:
                     # Update listbox with filtered suggestions
-                    listbox = self.suggestion_window.winfo_children()[0]
-                    listbox.delete(0, tk.END)
-                    
-                    for item in filtered:
-                        text = item["text"]
-                        item_type = item["type"]
-                        
-                        # Format based on type
-                        if item_type == "keyword":
-                            text = f"🔑 {text}"
-                        elif item_type == "function":
-                            text = f"🔧 {text}()"
-                        elif item_type == "variable":
-                            text = f"📌 {text}"
-                        elif item_type == "struct":
-                            text = f"📦 {text}"
-                        elif item_type == "enum":
-                            text = f"📋 {text}"
-                        elif item_type == "preprocessor":
-                            text = f"⚙️ {text}"
-                        elif item_type == "header":
-                            text = f"📄 {text}"
-                        elif item_type == "member":
-                            text = f"🔹 {text}"
-                        elif item_type == "snippet":
-                            text = f"✂️ {text}"
-                        
-                        listbox.insert(tk.END, text)
-                    
-                    # Select first item
-                    if filtered:
-                        listbox.selection_set(0)
+                    self._fill_suggestion_listbox(filtered)
                     
                     # Update stored suggestions
                     self.current_suggestions = filtered
+                    self._suggestions_lower = [lower for _, lower in kept]
     
     def _dismiss_suggestions(self, event=None):
         """Close the suggestions window"""
+        self._cancel_pending_suggestions()
         if self.suggestion_window:
-            self.suggestion_window.destroy()
+            # Hide rather than destroy, so the next popup skips widget creation
+            self.suggestion_window.withdraw()
             self.suggestion_window = None
             self.current_suggestions = []
+            self._suggestions_lower = []
         return None  # Allow default handling
     
     def _dismiss_param_info(self, event=None):
@@ -894,7 +1458,7 @@ class Intellisense:
         if not self.editor:
             return
         
-        content = self.editor.get("1.0", "end-1c")
+        content = get_code(self.editor)
         
         # Clear existing file-specific symbols
         file_symbols = {
@@ -905,16 +1469,28 @@ class Intellisense:
             "typedefs": {}
         }
         
-        # Scan for variable declarations
-        var_pattern = r'(int|char|float|double|long|short|unsigned|signed|struct\s+\w+|enum\s+\w+|\w+)\s+\*?(\w+)(?:\[.*\])?(?:\s*=\s*.+)?;'
-        for match in re.finditer(var_pattern, content):
-            var_type = match.group(1)
-            var_name = match.group(2)
-            file_symbols["variables"][var_name] = var_type
+        # Scan for variable declarations, reusing results for unchanged lines
+        line_cache = {}
+        previous = self._line_var_cache
+        for line_text in content.split('\n'):
+            declarations = line_cache.get(line_text)
+            if declarations is None:
+                declarations = previous.get(line_text)
+                if declarations is None:
+                    declarations = [
+                        (match.group(2), match.group(1))
+                        for match in _VAR_DECL_RE.finditer(line_text)
+                    ]
+                line_cache[line_text] = declarations
+            
+            for var_name, var_type in declarations:
+                file_symbols["variables"][var_name] = var_type
+        
+        # Keep only the lines that still exist
+        self._line_var_cache = line_cache
         
         # Scan for function declarations/definitions
-        func_pattern = r'(int|void|char|float|double|long|short|unsigned|signed|struct\s+\w+|enum\s+\w+|\w+)\s+(\w+)\s*\((.*)\)'
-        for match in re.finditer(func_pattern, content):
+        for match in _FUNC_RE.finditer(content):
             return_type = match.group(1)
             func_name = match.group(2)
             params_text = match.group(3)
@@ -927,7 +1503,7 @@ class Intellisense:
                     part = part.strip()
                     if part:
                         # Extract parameter type and name
-                        param_match = re.match(r'(.*?)(\w+)(?:\[.*\])?$', part)
+                        param_match = _TYPED_NAME_RE.match(part)
                         if param_match:
                             param_type = param_match.group(1).strip()
                             param_name = param_match.group(2).strip()
@@ -939,8 +1515,7 @@ class Intellisense:
             }
         
         # Scan for struct definitions
-        struct_pattern = r'struct\s+(\w+)\s*\{([^}]*)\}'
-        for match in re.finditer(struct_pattern, content):
+        for match in _STRUCT_RE.finditer(content):
             struct_name = match.group(1)
             struct_body = match.group(2)
             
@@ -950,7 +1525,7 @@ class Intellisense:
                 line = line.strip()
                 if line:
                     # Extract member type and name
-                    member_match = re.match(r'(.*?)(\w+)(?:\[.*\])?$', line)
+                    member_match = _TYPED_NAME_RE.match(line)
                     if member_match:
                         member_type = member_match.group(1).strip()
                         member_name = member_match.group(2).strip()
@@ -959,8 +1534,7 @@ class Intellisense:
             file_symbols["structs"][struct_name] = {"members": members}
         
         # Scan for enum definitions
-        enum_pattern = r'enum\s+(\w+)\s*\{([^}]*)\}'
-        for match in re.finditer(enum_pattern, content):
+        for match in _ENUM_RE.finditer(content):
             enum_name = match.group(1)
             enum_body = match.group(2)
             
@@ -978,8 +1552,7 @@ class Intellisense:
             file_symbols["enums"][enum_name] = {"values": values}
         
         # Scan for typedef statements
-        typedef_pattern = r'typedef\s+(.*?)\s+(\w+);'
-        for match in re.finditer(typedef_pattern, content):
+        for match in _TYPEDEF_RE.finditer(content):
             original = match.group(1)
             alias = match.group(2)
             file_symbols["typedefs"][alias] = original
@@ -987,73 +1560,87 @@ class Intellisense:
         # Update project symbols with file symbols
         for category in file_symbols:
             self.project_symbols[category].update(file_symbols[category])
+            self.add_symbols(category, file_symbols[category])
+    
+    def _index_function(self, func_name):
+        """Add or refresh a project function in the completion trie"""
+        details = self.project_symbols["functions"][func_name]
+        self._function_trie.insert(
+            func_name,
+            _function_suggestion(func_name, details),
+            self._function_ranks.get(func_name, 0)
+        )
     
     def scan_project_files(self):
         """
         Scan all C files in the project for symbols
+        
+        Files whose modification time and size are unchanged since the last
+        scan reuse their cached symbols; the rest are read and parsed on a
+        thread pool.
         """
         if "current_directory" in self.state:
             dir_path = self.state["current_directory"]
-            
-            try:
-                for root, dirs, files in os.walk(dir_path):
-                    for file in files:
-                        if file.endswith('.c') or file.endswith('.h'):
-                            file_path = os.path.join(root, file)
-                            self._scan_file(file_path)
-            except Exception:
-                pass
+            paths, file_cache = _scan_project(dir_path, self._previous_scan(dir_path))
+            self._apply_project_scan(dir_path, paths, file_cache)
+    
+    def _previous_scan(self, dir_path):
+        """Get a copy of the parsed-file cache if it belongs to dir_path"""
+        if self._scanned_dir == dir_path:
+            return dict(self._file_cache)
+        return None
+    
+    def _apply_project_scan(self, dir_path, paths, file_cache):
+        """Merge a project scan into project symbols, in walk order"""
+        self._file_cache = file_cache
+        self._scanned_dir = dir_path
+        
+        for file_path in paths:
+            cached = file_cache.get(file_path)
+            if cached is not None:
+                self._merge_file_symbols(cached)
+        
+        self._rebuild_function_trie()
+    
+    def _rebuild_function_trie(self):
+        """Re-rank every project function by how many files define it"""
+        ranks = {}
+        for _, functions, _ in self._file_cache.values():
+            for func_name in functions:
+                ranks[func_name] = ranks.get(func_name, 0) + 1
+        
+        self._function_ranks = ranks
+        self._function_trie = _RankedTrie()
+        self._symbols_version += 1
+        for func_name in self.project_symbols["functions"]:
+            self._index_function(func_name)
+    
+    def _merge_file_symbols(self, cached):
+        """Merge a parsed file into project symbols; names already known take precedence"""
+        _, functions, structs = cached
+        for func_name, details in functions.items():
+            self.project_symbols["functions"].setdefault(func_name, details)
+        for struct_name, details in structs.items():
+            self.project_symbols["structs"].setdefault(struct_name, details)
+        
+        self.add_symbols("structs", structs)
     
     def _scan_file(self, file_path):
         """
         Scan a single file for symbols
         """
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            # Use same scanning logic as scan_current_file, but store in project symbols
-            # This simplified version only scans for function and struct definitions
-            
-            # Scan for function declarations/definitions
-            func_pattern = r'(int|void|char|float|double|long|short|unsigned|signed|struct\s+\w+|enum\s+\w+|\w+)\s+(\w+)\s*\((.*)\)'
-            for match in re.finditer(func_pattern, content):
-                return_type = match.group(1)
-                func_name = match.group(2)
-                params_text = match.group(3)
-                
-                # Skip if already in project symbols
-                if func_name in self.project_symbols["functions"]:
-                    continue
-                
-                # Parse parameters simplified
-                params = []
-                if params_text.strip() and params_text.strip() != "void":
-                    param_parts = params_text.split(',')
-                    for part in param_parts:
-                        part = part.strip()
-                        if part:
-                            params.append({"type": "param", "name": part})
-                
-                self.project_symbols["functions"][func_name] = {
-                    "return_type": return_type,
-                    "params": params,
-                    "desc": f"From {os.path.basename(file_path)}"
-                }
-            
-            # Simplified struct scanning
-            struct_pattern = r'struct\s+(\w+)\s*\{([^}]*)\}'
-            for match in re.finditer(struct_pattern, content):
-                struct_name = match.group(1)
-                
-                # Skip if already in project symbols
-                if struct_name in self.project_symbols["structs"]:
-                    continue
-                
-                self.project_symbols["structs"][struct_name] = {
-                    "members": {},
-                    "desc": f"From {os.path.basename(file_path)}"
-                }
-                
-        except Exception:
-            pass
+            # Only re-read the file if it changed since it was last parsed
+            st = os.stat(file_path)
+        except OSError:
+            return
+        
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._file_cache.get(file_path)
+        if cached is None or cached[0] != key:
+            result = _read_file_symbols(file_path)
+            if result is None:
+                return
+            cached = self._file_cache[file_path] = (key,) + result
+        
+        self._merge_file_symbols(cached)